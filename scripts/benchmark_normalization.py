@@ -0,0 +1,234 @@
+"""
+Times the normalization of synthetic recipes at several sizes and reports how the
+run time scales with the size.
+
+    python scripts/benchmark_normalization.py --sizes 10 30 100 300 --repeats 3
+
+Every benchmark normalizes sections built in memory from the synthetic uploads of
+`ingredients_for_example.py`, with the step ingredients referencing their
+Ingredient sections directly. Nothing is looked up in FoodData Central or written
+to an upload, the USDA lookup and the creation of entries are replaced by offline
+stand-ins. For every benchmark, the exponent of a power law fitted to the run times
+is reported, an exponent well above 1 hints at a quadratic path.
+"""
+
+import argparse
+import json
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+import numpy as np
+from ingredients_for_example import synthetic_ingredients, synthetic_upload
+from nomad.datamodel import EntryArchive, EntryMetadata
+from nomad.normalizing.metainfo import MetainfoNormalizer
+from nomad.utils import get_logger
+
+from nomad_tajine_plugin.schema_packages import schema_package
+from nomad_tajine_plugin.schema_packages.schema_package import (
+    Ingredient,
+    Recipe,
+    RecipeScaler,
+)
+
+logger = get_logger(__name__)
+
+
+def offline_lookup(ingredients: list[dict]) -> Callable[..., dict | None]:
+    """
+    Returns a stand-in for `get_usda_data` answering from the synthetic data.
+    """
+    foods = {
+        data['name']: {
+            'protein': data['protein_per_100_g'],
+            'fat': data['fat_per_100_g'],
+            'carbohydrates': data['carbohydrates_per_100_g'],
+            'calories_kcal': data['calories_per_100_g'],
+            'diet_type': data['diet_type'],
+            'fdc_id': 100000 + index,
+            'ndb_id': 1000 + index,
+        }
+        for index, data in enumerate(ingredients)
+    }
+    return lambda name, api_key, **kwargs: foods.get(name)
+
+
+@contextmanager
+def offline(ingredients: list[dict]) -> Iterator[None]:
+    replaced = {
+        'get_usda_data': offline_lookup(ingredients),
+        'find_archive': lambda archive, file_name: None,
+        'create_archives': lambda entities, archive, overwrite, compact: (
+            [None] * len(entities)
+        ),
+    }
+    original = {name: getattr(schema_package, name) for name in replaced}
+    for name, function in replaced.items():
+        setattr(schema_package, name, function)
+    try:
+        yield
+    finally:
+        for name, function in original.items():
+            setattr(schema_package, name, function)
+
+
+def build_recipe(size: int, seed: int) -> tuple[EntryArchive, list[dict]]:
+    """
+    Returns an archive with a recipe of `size` ingredient amounts in `size // 10`
+    steps, and the data of its Ingredient entries.
+    """
+    ingredient_data, (recipe_data,) = synthetic_upload(
+        1, max(1, size // 10), size, seed=seed
+    )
+    ingredients = {
+        data['name']: Ingredient.m_from_dict(data) for data in ingredient_data
+    }
+    recipe = Recipe.m_from_dict(recipe_data)
+    for step in recipe.steps:
+        for amount in step.ingredients:
+            amount.reference = ingredients[amount.name]
+    return EntryArchive(data=recipe, metadata=EntryMetadata()), ingredient_data
+
+
+def bench_ingredient(size: int, seed: int) -> Callable[[], None]:
+    ingredient_data = synthetic_ingredients(size, seed, fdc_ids=False)
+    archives = [
+        EntryArchive(data=Ingredient.m_from_dict(data), metadata=EntryMetadata())
+        for data in ingredient_data
+    ]
+
+    def run():
+        with offline(ingredient_data):
+            for archive in archives:
+                archive.data.normalize(archive, logger)
+
+    return run
+
+
+def bench_ingredient_amount(size: int, seed: int) -> Callable[[], None]:
+    archive, ingredient_data = build_recipe(size, seed)
+
+    def run():
+        with offline(ingredient_data):
+            for step in archive.data.steps:
+                for amount in step.ingredients:
+                    amount.normalize(archive, logger)
+
+    return run
+
+
+def bench_recipe(size: int, seed: int) -> Callable[[], None]:
+    archive, ingredient_data = build_recipe(size, seed)
+
+    def run():
+        with offline(ingredient_data):
+            MetainfoNormalizer().normalize(archive, logger)
+
+    return run
+
+
+def bench_recipe_scaler(size: int, seed: int) -> Callable[[], None]:
+    recipe_archive, ingredient_data = build_recipe(size, seed)
+    with offline(ingredient_data):
+        MetainfoNormalizer().normalize(recipe_archive, logger)
+    scaler = RecipeScaler(
+        name='Scaler',
+        original_recipe=recipe_archive.data,
+        desired_servings=recipe_archive.data.number_of_servings * 2,
+        target_servings=[1, 2, 4, 8, 16],
+        materialize=True,
+    )
+    archive = EntryArchive(data=scaler, metadata=EntryMetadata())
+
+    def run():
+        with offline(ingredient_data):
+            scaler.normalize(archive, logger)
+
+    return run
+
+
+BENCHMARKS = {
+    'Ingredient.normalize': bench_ingredient,
+    'IngredientAmount.normalize': bench_ingredient_amount,
+    'Recipe.normalize': bench_recipe,
+    'RecipeScaler.normalize': bench_recipe_scaler,
+}
+
+
+def measure(
+    benchmark: Callable[[int, int], Callable[[], None]],
+    size: int,
+    repeats: int,
+    seed: int,
+) -> float:
+    """
+    Returns the fastest of `repeats` runs on freshly built sections in seconds.
+    """
+    times = []
+    for _ in range(repeats):
+        run = benchmark(size, seed)
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def scaling_exponent(sizes: list[int], seconds: list[float]) -> float:
+    """
+    Returns the exponent `k` of the power law `t ~ size**k` fitted to the run times.
+    """
+    return float(np.polyfit(np.log(sizes), np.log(seconds), 1)[0])
+
+
+def run_benchmarks(
+    sizes: list[int], repeats: int = 3, seed: int = 0, names: list[str] | None = None
+) -> dict[str, dict]:
+    results = {}
+    for name in names or BENCHMARKS:
+        seconds = [measure(BENCHMARKS[name], size, repeats, seed) for size in sizes]
+        results[name] = {
+            'sizes': sizes,
+            'seconds': seconds,
+            'exponent': scaling_exponent(sizes, seconds) if len(sizes) > 1 else None,
+        }
+    return results
+
+
+def report(results: dict[str, dict]) -> None:
+    for name, result in results.items():
+        print(f'\n{name}')
+        print(f'{"size":>8} {"seconds":>10} {"µs/item":>10}')
+        for size, seconds in zip(result['sizes'], result['seconds']):
+            print(f'{size:>8} {seconds:>10.4f} {seconds / size * 1e6:>10.1f}')
+        exponent = result['exponent']
+        if exponent is not None:
+            note = ', superlinear' if exponent > 1.5 else ''  # noqa: PLR2004
+            print(f'scaling exponent: {exponent:.2f}{note}')
+
+
+def main(args: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--sizes',
+        type=int,
+        nargs='+',
+        default=[10, 30, 100, 300],
+        help='Numbers of ingredients to benchmark with.',
+    )
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--benchmark', choices=list(BENCHMARKS), action='append', dest='names'
+    )
+    parser.add_argument('--json', help='Write the results to this JSON file.')
+    parsed = parser.parse_args(args)
+
+    results = run_benchmarks(parsed.sizes, parsed.repeats, parsed.seed, parsed.names)
+    report(results)
+    if parsed.json:
+        with open(parsed.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
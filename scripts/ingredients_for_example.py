@@ -1,14 +1,31 @@
+"""
+Writes the Ingredient entries of the example upload and generates synthetic uploads
+for benchmarks.
+
+Without arguments, the ingredients of the example upload are written. With
+`--recipes`, a seeded synthetic upload with N recipes of M steps and K ingredient
+amounts each is written instead:
+
+    python scripts/ingredients_for_example.py --recipes 100 --steps 10 \
+        --ingredients 40 --seed 1 --out synthetic_upload
+
+The amounts are given by mass, volume and pieces, and some ingredients are used in
+several steps of a recipe, like in real recipes.
+"""
+
+import argparse
 from pathlib import Path
 
+import numpy as np
 import yaml
 
+SCHEMA = 'nomad_tajine_plugin.schema_packages.schema_package'
+
 # Output folder: relative to this script
 OUT_DIR = (
     Path(__file__).parent.parent
     / 'src/nomad_tajine_plugin/example_uploads/example/ingredients'
 )
-print(OUT_DIR)
-OUT_DIR.mkdir(parents=True, exist_ok=True)
 
 # Ingredient data: name → {density (g/L), kcal, fat, protein, carbs}
 INGREDIENTS = {
@@ -172,25 +189,196 @@ def slugify(name: str) -> str:
     return name.lower().replace(' ', '_').replace(',', '')
 
 
-for name, vals in INGREDIENTS.items():
-    filename = OUT_DIR / f'{slugify(name)}.archive.yaml'
+def ingredient_data(name: str, vals: dict) -> dict:
+    return {
+        'm_def': f'{SCHEMA}.Ingredient',
+        'name': name,
+        'diet_type': vals['diet_type'],
+        'density': vals['density'],
+        'calories_per_100_g': vals['kcal'],
+        'fat_per_100_g': vals['fat'],
+        'protein_per_100_g': vals['protein'],
+        'carbohydrates_per_100_g': vals['carbs'],
+    }
+
+
+def write_archive(filename: Path, data: dict) -> None:
+    with filename.open('w', encoding='utf-8') as f:
+        yaml.dump({'data': data}, f, sort_keys=False, allow_unicode=True)
+
+
+def write_example_ingredients(out_dir: Path = OUT_DIR) -> None:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for name, vals in INGREDIENTS.items():
+        filename = out_dir / f'{slugify(name)}.archive.yaml'
+        write_archive(filename, ingredient_data(name, vals))
+        print(f'✅ Created {filename.name}')
+
+    print('\nAll ingredient .archive.yaml files generated successfully.')
 
-    data = {
-        'data': {
-            'm_def': 'nomad_tajine_plugin.schema_packages.schema_package.Ingredient',
-            'name': name,
-            'diet_type': vals['diet_type'],
-            'density': vals['density'],
-            'calories_per_100_g': vals['kcal'],
-            'fat_per_100_g': vals['fat'],
-            'protein_per_100_g': vals['protein'],
-            'carbohydrates_per_100_g': vals['carbs'],
+
+def synthetic_ingredients(
+    number_of_ingredients: int, seed: int = 0, fdc_ids: bool = True
+) -> list[dict]:
+    """
+    Returns the data of `number_of_ingredients` Ingredient entries. The example
+    ingredients are used first, further ones are variants of them with jittered
+    nutrients. With `fdc_ids`, the ingredients carry an FDC ID, so that their
+    normalization does not look them up in FoodData Central.
+    """
+    rng = np.random.default_rng(seed)
+    names = list(INGREDIENTS)
+    ingredients = []
+    for index in range(number_of_ingredients):
+        base = names[index % len(names)]
+        name = base if index < len(names) else f'{base} {index // len(names)}'
+        vals = dict(INGREDIENTS[base])
+        if index >= len(names):
+            for key in ('kcal', 'fat', 'protein', 'carbs'):
+                vals[key] = round(vals[key] * rng.uniform(0.8, 1.2), 2)
+        data = ingredient_data(name, vals)
+        data['lab_id'] = slugify(name)
+        data['weight_per_piece'] = round(float(rng.uniform(5, 200)), 1)
+        if fdc_ids:
+            data['fdc_id'] = 100000 + index
+        ingredients.append(data)
+    return ingredients
+
+
+def synthetic_recipe(  # noqa: PLR0913
+    index: int,
+    ingredient_names: list[str],
+    number_of_steps: int,
+    number_of_ingredients: int,
+    *,
+    duplicate_ratio: float = 0.25,
+    seed: int = 0,
+) -> dict:
+    """
+    Returns the data of a Recipe entry with `number_of_steps` steps and
+    `number_of_ingredients` ingredient amounts spread over the steps. A fraction
+    `duplicate_ratio` of the amounts repeats ingredients of other amounts.
+    """
+    rng = np.random.default_rng([seed, index])
+    distinct = max(1, round(number_of_ingredients * (1 - duplicate_ratio)))
+    names = list(
+        rng.choice(
+            ingredient_names, min(distinct, len(ingredient_names)), replace=False
+        )
+    )
+    names += list(rng.choice(names, number_of_ingredients - len(names)))
+    rng.shuffle(names)
+
+    steps = [
+        {
+            'instruction': f'Step {step + 1} of synthetic recipe {index}.',
+            'duration': float(rng.integers(1, 30)),
+            'tools': [{'name': f'Tool {rng.integers(10)}'}],
+            'ingredients': [],
         }
+        for step in range(number_of_steps)
+    ]
+    for position, name in enumerate(names):
+        kind = rng.choice(['mass', 'volume', 'pieces'], p=[0.5, 0.3, 0.2])
+        amount = {'name': str(name)}
+        if kind == 'mass':
+            amount['mass'] = round(float(rng.uniform(1, 500)), 1)
+        elif kind == 'volume':
+            amount['m_def'] = f'{SCHEMA}.IngredientVolume'
+            amount['volume'] = round(float(rng.uniform(1, 250)), 1)
+        else:
+            amount['m_def'] = f'{SCHEMA}.IngredientPiece'
+            amount['pieces'] = float(rng.integers(1, 6))
+        steps[position % number_of_steps]['ingredients'].append(amount)
+
+    return {
+        'm_def': f'{SCHEMA}.Recipe',
+        'name': f'Synthetic Recipe {index}',
+        'number_of_servings': int(rng.integers(1, 9)),
+        'steps': steps,
     }
 
-    with filename.open('w', encoding='utf-8') as f:
-        yaml.dump(data, f, sort_keys=False, allow_unicode=True)
 
-    print(f'✅ Created {filename.name}')
+def synthetic_upload(  # noqa: PLR0913
+    number_of_recipes: int,
+    number_of_steps: int,
+    number_of_ingredients: int,
+    *,
+    ingredient_types: int | None = None,
+    duplicate_ratio: float = 0.25,
+    seed: int = 0,
+    fdc_ids: bool = True,
+) -> tuple[list[dict], list[dict]]:
+    """
+    Returns the data of the Ingredient and Recipe entries of a synthetic upload.
+    The recipes draw their ingredients from `ingredient_types` Ingredient entries,
+    by default twice as many as amounts per recipe.
+    """
+    ingredients = synthetic_ingredients(
+        ingredient_types or 2 * number_of_ingredients, seed, fdc_ids
+    )
+    names = [ingredient['name'] for ingredient in ingredients]
+    recipes = [
+        synthetic_recipe(
+            index,
+            names,
+            number_of_steps,
+            number_of_ingredients,
+            duplicate_ratio=duplicate_ratio,
+            seed=seed,
+        )
+        for index in range(number_of_recipes)
+    ]
+    return ingredients, recipes
+
+
+def write_synthetic_upload(out_dir: Path, **kwargs) -> None:
+    ingredients, recipes = synthetic_upload(**kwargs)
+    (out_dir / 'ingredients').mkdir(parents=True, exist_ok=True)
+    for data in ingredients:
+        write_archive(out_dir / 'ingredients' / f'{data["lab_id"]}.archive.yaml', data)
+    for index, data in enumerate(recipes):
+        write_archive(out_dir / f'synthetic_recipe_{index:05d}.archive.yaml', data)
+    print(
+        f'Created {len(ingredients)} ingredients and {len(recipes)} recipes '
+        f'in {out_dir}.'
+    )
+
+
+def main(args: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--recipes', type=int, help='Number of synthetic recipes.')
+    parser.add_argument('--steps', type=int, default=5, help='Steps per recipe.')
+    parser.add_argument(
+        '--ingredients', type=int, default=20, help='Ingredient amounts per recipe.'
+    )
+    parser.add_argument(
+        '--ingredient-types', type=int, help='Number of Ingredient entries.'
+    )
+    parser.add_argument(
+        '--duplicates',
+        type=float,
+        default=0.25,
+        help='Fraction of amounts that repeat an ingredient of the recipe.',
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', type=Path, default=Path('synthetic_upload'))
+    parsed = parser.parse_args(args)
+
+    if parsed.recipes is None:
+        print(OUT_DIR)
+        write_example_ingredients()
+        return
+    write_synthetic_upload(
+        parsed.out,
+        number_of_recipes=parsed.recipes,
+        number_of_steps=parsed.steps,
+        number_of_ingredients=parsed.ingredients,
+        ingredient_types=parsed.ingredient_types,
+        duplicate_ratio=parsed.duplicates,
+        seed=parsed.seed,
+    )
+
 
-print('\nAll ingredient .archive.yaml files generated successfully.')
+if __name__ == '__main__':
+    main()
@@ -17,6 +17,8 @@ from nomad.config.models.ui import (
 )
 
 SCHEMA = 'nomad_tajine_plugin.schema_packages.schema_package.Recipe'
+CARBOHYDRATES_PER_SERVING = f'data.carbohydrates_per_serving#{SCHEMA}'
+NUMBER_OF_INGREDIENTS = f'data.number_of_ingredients#{SCHEMA}'
 
 recipe_app_entry_point = AppEntryPoint(
     name='Recipe App',
@@ -66,6 +68,10 @@ recipe_app_entry_point = AppEntryPoint(
                 selected=True,
                 unit='kcal',
             ),
+            Column(
+                quantity=NUMBER_OF_INGREDIENTS,
+                label='Ingredients',
+            ),
         ],
         menu=Menu(
             title='Recipe filters',
@@ -114,30 +120,48 @@ recipe_app_entry_point = AppEntryPoint(
                         ),
                         MenuItemHistogram(
                             title='Carbohydrates per serving',
+                            x={'search_quantity': CARBOHYDRATES_PER_SERVING},
+                            n_bins=100,
+                            autorange=True,
+                        ),
+                        MenuItemHistogram(
+                            title='Calorie density',
                             x={
-                                'search_quantity': f'data.carbohydrates_per_serving#{SCHEMA}',  # noqa: E501
+                                'search_quantity': f'data.calorie_density#{SCHEMA}',
+                                'unit': 'kcal/g',
                             },
                             n_bins=100,
                             autorange=True,
                         ),
+                        MenuItemHistogram(
+                            title='Protein ratio',
+                            x={'search_quantity': f'data.protein_ratio#{SCHEMA}'},
+                            n_bins=100,
+                            autorange=True,
+                        ),
                     ],
                 ),
                 Menu(
                     title='Ingredients',
                     items=[
                         MenuItemTerms(
-                            quantity=f'data.ingredients.name#{SCHEMA}',
-                            title='Ingredient name',
+                            quantity=f'data.ingredient_lab_ids#{SCHEMA}',
+                            title='Ingredient',
                             show_input=True,
                             options=8,
                         ),
+                        MenuItemHistogram(
+                            title='Number of ingredients',
+                            x={'search_quantity': NUMBER_OF_INGREDIENTS},
+                            autorange=True,
+                        ),
                     ],
                 ),
                 Menu(
                     title='Kitchen tools',
                     items=[
                         MenuItemTerms(
-                            quantity=f'data.tools.name#{SCHEMA}',
+                            quantity=f'data.tool_names#{SCHEMA}',
                             title='Tool name',
                             show_input=True,
                         ),
@@ -260,6 +284,38 @@ recipe_app_entry_point = AppEntryPoint(
                         'lg': Layout(w=6, h=6, x=18, y=0, minW=6, minH=6),
                     },
                 ),
+                WidgetHistogram(
+                    title='Number of ingredients',
+                    x=AxisQuantity(search_quantity=NUMBER_OF_INGREDIENTS),
+                    autorange=True,
+                    layout={
+                        'md': Layout(w=6, h=3, x=0, y=6, minW=3, minH=3),
+                        'lg': Layout(w=6, h=3, x=0, y=6, minW=5, minH=4),
+                    },
+                ),
+                WidgetHistogram(
+                    title='Calorie density',
+                    x=AxisQuantity(
+                        search_quantity=f'data.calorie_density#{SCHEMA}',
+                        unit='kcal/g',
+                    ),
+                    n_bins=100,
+                    autorange=True,
+                    layout={
+                        'md': Layout(w=6, h=3, x=6, y=6, minW=3, minH=3),
+                        'lg': Layout(w=6, h=3, x=6, y=6, minW=5, minH=4),
+                    },
+                ),
+                WidgetHistogram(
+                    title='Protein ratio',
+                    x=AxisQuantity(search_quantity=f'data.protein_ratio#{SCHEMA}'),
+                    n_bins=100,
+                    autorange=True,
+                    layout={
+                        'md': Layout(w=6, h=3, x=12, y=6, minW=3, minH=3),
+                        'lg': Layout(w=6, h=3, x=12, y=6, minW=5, minH=4),
+                    },
+                ),
             ],
         ),
     ),
@@ -0,0 +1,188 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Iterates over the results of the search and archive query endpoints of a NOMAD
+API as generators, for scripts that go through all recipes of an installation.
+
+Results are fetched page by page with the `page_after_value` cursor. While the
+entries of one page are consumed, the next page is already requested in the
+background, so at most two pages are held in memory at a time.
+"""
+
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+
+RECIPE_SCHEMA = 'nomad_tajine_plugin.schema_packages.schema_package.Recipe'
+RECIPE_QUERY = {'section_defs.definition_qualified_name': RECIPE_SCHEMA}
+RECIPE_FIELDS = (
+    'name',
+    'duration',
+    'authors',
+    'cuisine',
+    'difficulty',
+    'diet_type',
+    'number_of_servings',
+    'calories_per_serving',
+    'fat_per_serving',
+    'protein_per_serving',
+    'carbohydrates_per_serving',
+    'ingredient_lab_ids',
+    'tool_names',
+)
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+
+
+def retry_delay(retry_after: str | None, attempt: int) -> float:
+    """
+    Returns the seconds to wait before the next attempt from a `Retry-After` header
+    given in seconds or as an HTTP date. Without a valid header, the delay doubles
+    with every attempt.
+    """
+    if retry_after:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            pass
+        try:
+            date = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            pass
+        else:
+            if date.tzinfo is None:
+                date = date.replace(tzinfo=timezone.utc)
+            return max((date - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    return float(2**attempt)
+
+
+class NomadClient:
+    """
+    A minimal client of the NOMAD API given by its base URL, for example
+    `http://localhost/nomad-oasis/api/v1`.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        token: str | None = None,
+        timeout: float = 60.0,
+        retries: int = 3,
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.retries = retries
+        self.session = requests.Session()
+        if token:
+            self.session.headers['Authorization'] = f'Bearer {token}'
+
+    def post(self, path: str, body: dict) -> dict:
+        """
+        Posts the body to the endpoint, retrying when the server is busy.
+        """
+        for attempt in range(self.retries + 1):
+            response = self.session.post(
+                f'{self.base_url}/{path}', json=body, timeout=self.timeout
+            )
+            if response.status_code not in RETRY_STATUS_CODES or (
+                attempt == self.retries
+            ):
+                break
+            time.sleep(retry_delay(response.headers.get('Retry-After'), attempt))
+        response.raise_for_status()
+        return response.json()
+
+    def iter_pages(self, path: str, body: dict, page_size: int) -> Iterator[list]:
+        """
+        Yields the data of all result pages of a query endpoint, requesting the next
+        page while the current one is processed.
+        """
+        body = dict(body)
+        pagination = dict(body.get('pagination') or {}, page_size=page_size)
+        pagination.pop('page_after_value', None)
+
+        def fetch(page_after_value: str | None) -> dict:
+            page = dict(pagination)
+            if page_after_value is not None:
+                page['page_after_value'] = page_after_value
+            return self.post(path, dict(body, pagination=page))
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(fetch, None)
+            while future is not None:
+                response = future.result()
+                next_value = response.get('pagination', {}).get('next_page_after_value')
+                data = response.get('data', [])
+                future = executor.submit(fetch, next_value) if next_value else None
+                yield data
+                if not data:
+                    break
+
+    def iter_entries(
+        self,
+        query: dict | None = None,
+        include: list[str] | None = None,
+        page_size: int = 100,
+        owner: str = 'visible',
+    ) -> Iterator[dict]:
+        """
+        Yields the search results of the entries matching the query. With `include`,
+        only the given fields of the search index are returned.
+        """
+        body = {'owner': owner, 'query': query or {}}
+        if include is not None:
+            body['required'] = {'include': list(include)}
+        for page in self.iter_pages('entries/query', body, page_size):
+            yield from page
+
+    def iter_archives(
+        self,
+        query: dict | None = None,
+        required: dict | str = '*',
+        page_size: int = 100,
+        owner: str = 'visible',
+    ) -> Iterator[dict]:
+        """
+        Yields the archives of the entries matching the query as dicts with the
+        `entry_id` and the `archive`, reduced to the `required` parts.
+        """
+        body = {'owner': owner, 'query': query or {}, 'required': required}
+        for page in self.iter_pages('entries/archive/query', body, page_size):
+            yield from page
+
+    def iter_recipes(
+        self,
+        query: dict | None = None,
+        fields: tuple[str, ...] = RECIPE_FIELDS,
+        page_size: int = 100,
+    ) -> Iterator[dict]:
+        """
+        Yields the `data` of all `Recipe` entries matching the query with only the
+        given quantities, by default the ones shown in the Recipe app.
+        """
+        query = dict(RECIPE_QUERY, **(query or {}))
+        required = {'data': dict.fromkeys(fields, '*')}
+        for result in self.iter_archives(query, required, page_size):
+            yield dict(
+                result.get('archive', {}).get('data', {}),
+                entry_id=result.get('entry_id'),
+                upload_id=result.get('upload_id'),
+            )
@@ -0,0 +1,272 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Exports `Recipe` and `Ingredient` entries into columnar Parquet tables for analysis.
+
+Archives are read one at a time, either from an upload of a NOMAD installation or
+from a directory of archive files, and flattened into rows of three tables:
+
+- `recipes`: one row per recipe with its totals and per-serving nutrients,
+- `step_ingredients`: one row per ingredient of each recipe step,
+- `ingredients`: one row per ingredient entry with its nutrients per 100 g.
+
+Every table is written as a directory of Parquet files with one file per batch of
+rows, so memory is bounded by the batch size. Values are given in the units of the
+schema: masses in g, volumes in ml, durations in minutes and energy in kcal.
+
+Writing requires `pyarrow`, which is installed with the `export` extra:
+
+    python -m nomad_tajine_plugin.export <directory or upload id> <output directory>
+"""
+
+import argparse
+import json
+import os
+import re
+from collections.abc import Iterator
+
+import yaml
+
+from nomad_tajine_plugin.schema_packages.schema_package import NUTRIENTS
+
+ARCHIVE_FILE_RE = re.compile(r'.*\.(json|ya?ml)$')
+
+TABLES = {
+    'recipes': {
+        'id': 'string',
+        'name': 'string',
+        'cuisine': 'string',
+        'authors': 'string',
+        'difficulty': 'string',
+        'diet_type': 'string',
+        'number_of_servings': 'int',
+        'number_of_steps': 'int',
+        'number_of_ingredients': 'int',
+        'duration': 'float',
+        **{nutrient: 'float' for nutrient in NUTRIENTS},
+        **{f'{nutrient}_per_serving': 'float' for nutrient in NUTRIENTS},
+        'calorie_density': 'float',
+        'protein_ratio': 'float',
+    },
+    'step_ingredients': {
+        'recipe_id': 'string',
+        'recipe_name': 'string',
+        'step_index': 'int',
+        'ingredient_index': 'int',
+        'type': 'string',
+        'name': 'string',
+        'lab_id': 'string',
+        'reference': 'string',
+        'diet_type': 'string',
+        'mass': 'float',
+        'volume': 'float',
+        'pieces': 'float',
+        **{nutrient: 'float' for nutrient in NUTRIENTS},
+    },
+    'ingredients': {
+        'id': 'string',
+        'name': 'string',
+        'lab_id': 'string',
+        'diet_type': 'string',
+        'density': 'float',
+        'weight_per_piece': 'float',
+        'fdc_id': 'int',
+        'ndb_id': 'int',
+        **{f'{nutrient}_per_100_g': 'float' for nutrient in NUTRIENTS},
+    },
+}
+
+
+def section_name(data: dict) -> str:
+    """
+    Returns the name of the section definition of an archive's data, for both the
+    qualified names of raw files and the definition references of processed ones.
+    """
+    return re.split(r'[./]', data.get('m_def') or '')[-1]
+
+
+def project(data: dict, table: str, **values) -> dict:
+    row = {column: data.get(column) for column in TABLES[table]}
+    row.update(values)
+    return row
+
+
+def iter_rows(entry_id: str, data: dict) -> Iterator[tuple[str, dict]]:
+    """
+    Flattens the data of a `Recipe` or `Ingredient` entry into rows of the tables.
+    Data of other sections yields no rows.
+    """
+    name = section_name(data)
+    if name == 'Ingredient':
+        yield 'ingredients', project(data, 'ingredients', id=entry_id)
+        return
+    if name != 'Recipe':
+        return
+
+    steps = data.get('steps') or []
+    yield (
+        'recipes',
+        project(data, 'recipes', id=entry_id, number_of_steps=len(steps)),
+    )
+    for step_index, step in enumerate(steps):
+        for ingredient_index, ingredient in enumerate(step.get('ingredients') or []):
+            yield (
+                'step_ingredients',
+                project(
+                    ingredient,
+                    'step_ingredients',
+                    recipe_id=entry_id,
+                    recipe_name=data.get('name'),
+                    step_index=step_index,
+                    ingredient_index=ingredient_index,
+                    type=section_name(ingredient) or 'IngredientAmount',
+                ),
+            )
+
+
+def iter_directory(directory: str) -> Iterator[tuple[str, dict]]:
+    """
+    Yields the relative paths and data of all archive files in a directory tree.
+    """
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for file_name in sorted(files):
+            if not ARCHIVE_FILE_RE.match(file_name):
+                continue
+            path = os.path.join(root, file_name)
+            with open(path, encoding='utf-8') as f:
+                try:
+                    if file_name.endswith('.json'):
+                        archive = json.load(f)
+                    else:
+                        archive = yaml.safe_load(f)
+                except ValueError:
+                    continue
+            if isinstance(archive, dict) and isinstance(archive.get('data'), dict):
+                yield os.path.relpath(path, directory), archive['data']
+
+
+def iter_upload(upload_id: str) -> Iterator[tuple[str, dict]]:
+    """
+    Yields the entry ids and data of all successfully processed entries of an
+    upload of the NOMAD installation.
+    """
+    from nomad.processing import Entry, ProcessStatus
+
+    from nomad_tajine_plugin.utils import read_archive_data
+
+    entry_ids = [
+        entry.entry_id
+        for entry in Entry.objects(
+            upload_id=upload_id, process_status=ProcessStatus.SUCCESS
+        ).only('entry_id')
+    ]
+    yield from zip(entry_ids, read_archive_data(upload_id, entry_ids))
+
+
+class ParquetWriter:
+    """
+    Collects the rows of each table and writes a Parquet file per table every
+    `batch_size` rows into `<output>/<table>/part-<n>.parquet`.
+    """
+
+    def __init__(self, output: str, batch_size: int = 10000):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError(
+                'Exporting to Parquet requires pyarrow, install the "export" extra.'
+            ) from e
+        self.output = output
+        self.batch_size = batch_size
+        self.rows: dict[str, list[dict]] = {table: [] for table in TABLES}
+        self.parts = dict.fromkeys(TABLES, 0)
+        self.counts = dict.fromkeys(TABLES, 0)
+
+    @staticmethod
+    def schema(table: str):
+        import pyarrow as pa
+
+        types = {'string': pa.string(), 'int': pa.int64(), 'float': pa.float64()}
+        return pa.schema(
+            [(column, types[type_]) for column, type_ in TABLES[table].items()]
+        )
+
+    def add(self, table: str, row: dict) -> None:
+        self.rows[table].append(row)
+        if len(self.rows[table]) >= self.batch_size:
+            self.flush(table)
+
+    def flush(self, table: str) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        rows = self.rows[table]
+        if not rows:
+            return
+        directory = os.path.join(self.output, table)
+        os.makedirs(directory, exist_ok=True)
+        pq.write_table(
+            pa.Table.from_pylist(rows, schema=self.schema(table)),
+            os.path.join(directory, f'part-{self.parts[table]:05d}.parquet'),
+        )
+        self.parts[table] += 1
+        self.counts[table] += len(rows)
+        self.rows[table] = []
+
+    def close(self) -> dict[str, int]:
+        for table in TABLES:
+            self.flush(table)
+        return self.counts
+
+
+def export(
+    entries: Iterator[tuple[str, dict]], output: str, batch_size: int = 10000
+) -> dict[str, int]:
+    """
+    Writes the rows of the given entries into Parquet tables in the output directory.
+    Returns the number of rows written per table.
+    """
+    writer = ParquetWriter(output, batch_size)
+    for entry_id, data in entries:
+        for table, row in iter_rows(entry_id, data):
+            writer.add(table, row)
+    return writer.close()
+
+
+def main(args: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        'source', help='A directory of archive files or the id of an upload.'
+    )
+    parser.add_argument('output', help='The directory to write the tables to.')
+    parser.add_argument(
+        '--batch-size', type=int, default=10000, help='Rows per Parquet file.'
+    )
+    parsed = parser.parse_args(args)
+    if os.path.isdir(parsed.source):
+        entries = iter_directory(parsed.source)
+    else:
+        entries = iter_upload(parsed.source)
+    counts = export(entries, parsed.output, parsed.batch_size)
+    for table, count in counts.items():
+        print(f'{table}: {count} rows')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Picks recipes and numbers of servings from a corpus of recipes that meet daily
+targets for calories, protein, fat and carbohydrates.
+
+The per-serving nutrients of all candidates are loaded into one array, scaled by the
+targets. Meals are chosen greedily, each time taking the recipe and number of
+servings that reduces the remaining deviation the most, and then improved by
+replacing one meal at a time with the best alternative. Every step is evaluated for
+all candidates at once, so thousands of recipes are searched in milliseconds.
+"""
+
+from collections.abc import Iterable
+
+import numpy as np
+
+from nomad_tajine_plugin.schema_packages.schema_package import (
+    NUTRIENTS,
+    MealPlan,
+    PlannedMeal,
+)
+from nomad_tajine_plugin.utils import get_reference
+
+COMPATIBLE_DIETS = {
+    'vegan': {'vegan'},
+    'vegetarian': {'vegan', 'vegetarian'},
+}
+
+
+def load_candidates(
+    recipes: Iterable[dict], diet_type: str | None = None
+) -> tuple[list[dict], np.ndarray]:
+    """
+    Returns the recipes that fit the diet type and have all per-serving nutrients,
+    together with an array of their per-serving nutrients in kcal and g. Recipes are
+    given as dicts of `Recipe` data, e.g. from `NomadClient.iter_recipes`.
+    """
+    diets = COMPATIBLE_DIETS.get(diet_type)
+    candidates, rows = [], []
+    for recipe in recipes:
+        if diets is not None and recipe.get('diet_type') not in diets:
+            continue
+        row = [recipe.get(f'{nutrient}_per_serving') for nutrient in NUTRIENTS]
+        if any(value is None for value in row):
+            continue
+        candidates.append(recipe)
+        rows.append(row)
+    return candidates, np.array(rows, dtype=float).reshape(-1, len(NUTRIENTS))
+
+
+def best_addition(
+    residual: np.ndarray,
+    nutrients: np.ndarray,
+    available: np.ndarray,
+    min_servings: float,
+    max_servings: float,
+) -> tuple[int, float, float]:
+    """
+    Returns the candidate, its number of servings and the remaining squared
+    deviation for the candidate that best covers the residual.
+    """
+    norms = np.einsum('ij,ij->i', nutrients, nutrients)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        servings = np.clip(nutrients @ residual / norms, min_servings, max_servings)
+    deviations = residual[None, :] - servings[:, None] * nutrients
+    errors = np.einsum('ij,ij->i', deviations, deviations)
+    errors[~available | (norms == 0)] = np.inf
+    index = int(np.argmin(errors))
+    return index, float(servings[index]), float(errors[index])
+
+
+def optimize_servings(  # noqa: PLR0913
+    nutrients: np.ndarray,
+    targets: np.ndarray,
+    *,
+    number_of_meals: int = 3,
+    min_servings: float = 0.5,
+    max_servings: float = 3.0,
+    iterations: int = 5,
+    available: np.ndarray | None = None,
+) -> tuple[list[int], list[float]]:
+    """
+    Chooses `number_of_meals` distinct candidates and their servings whose summed
+    nutrients deviate the least from the targets, relative to each target.
+    """
+    scaled = nutrients / targets[None, :]
+    if available is None:
+        available = np.ones(len(scaled), dtype=bool)
+    available = available.copy()
+    number_of_meals = min(number_of_meals, int(available.sum()))
+
+    chosen, servings = [], []
+    residual = np.ones(len(targets))
+    for _ in range(number_of_meals):
+        index, serving, _ = best_addition(
+            residual, scaled, available, min_servings, max_servings
+        )
+        chosen.append(index)
+        servings.append(serving)
+        available[index] = False
+        residual = residual - serving * scaled[index]
+
+    for _ in range(iterations):
+        changed = False
+        for slot, index in enumerate(chosen):
+            # the deviation without this meal, which any candidate may now cover
+            residual = residual + servings[slot] * scaled[index]
+            available[index] = True
+            best, serving, _ = best_addition(
+                residual, scaled, available, min_servings, max_servings
+            )
+            changed = changed or best != index
+            chosen[slot], servings[slot] = best, serving
+            available[best] = False
+            residual = residual - serving * scaled[best]
+        if not changed:
+            break
+
+    return chosen, servings
+
+
+def plan_meals(  # noqa: PLR0913
+    recipes: Iterable[dict],
+    calories: float,
+    protein: float,
+    fat: float,
+    carbohydrates: float,
+    *,
+    diet_type: str | None = None,
+    number_of_meals: int = 3,
+    number_of_days: int = 1,
+    serving_step: float = 0.25,
+    min_servings: float = 0.5,
+    max_servings: float = 3.0,
+) -> MealPlan:
+    """
+    Returns a meal plan with `number_of_meals` recipes per day that meets the daily
+    targets in kcal and g. Every recipe is used on one day at most as long as there
+    are enough candidates. Servings are rounded to multiples of `serving_step`.
+    """
+    candidates, nutrients = load_candidates(recipes, diet_type)
+    targets = np.array(
+        [
+            dict(
+                calories=calories, protein=protein, fat=fat, carbohydrates=carbohydrates
+            )[nutrient]
+            for nutrient in NUTRIENTS
+        ],
+        dtype=float,
+    )
+    available = np.ones(len(candidates), dtype=bool)
+
+    plan = MealPlan(name='Optimized meal plan', diet_type=diet_type)
+    for day in range(1, number_of_days + 1):
+        if available.sum() < number_of_meals:
+            available[:] = True
+        chosen, servings = optimize_servings(
+            nutrients,
+            targets,
+            number_of_meals=number_of_meals,
+            min_servings=min_servings,
+            max_servings=max_servings,
+            available=available,
+        )
+        available[chosen] = False
+        if serving_step:
+            servings = [
+                max(serving_step, round(serving / serving_step) * serving_step)
+                for serving in servings
+            ]
+        for index, serving in zip(chosen, servings):
+            plan.meals.append(planned_meal(candidates[index], day, serving))
+
+    plan.compute_totals(list(plan.meals))
+    return plan
+
+
+def planned_meal(recipe: dict, day: int, servings: float) -> PlannedMeal:
+    meal = PlannedMeal(
+        name=recipe.get('name'),
+        day=day,
+        servings=servings,
+        diet_type=recipe.get('diet_type'),
+        duration=recipe.get('duration'),
+    )
+    if recipe.get('upload_id') and recipe.get('entry_id'):
+        meal.recipe = get_reference(recipe['upload_id'], recipe['entry_id'])
+    for nutrient in NUTRIENTS:
+        setattr(meal, f'{nutrient}_per_serving', recipe[f'{nutrient}_per_serving'])
+    return meal
@@ -1,18 +1,69 @@
 from nomad.config.models.plugins import ParserEntryPoint
-from pydantic import Field
 
 
-class NewParserEntryPoint(ParserEntryPoint):
-    parameter: int = Field(0, description='Custom configuration parameter')
+class RecipeCollectionParserEntryPoint(ParserEntryPoint):
+    def load(self):
+        from nomad_tajine_plugin.parsers.parser import RecipeCollectionParser
+
+        return RecipeCollectionParser(**self.model_dump())
+
+
+parser_entry_point = RecipeCollectionParserEntryPoint(
+    name='RecipeCollectionParser',
+    description=(
+        'Parser for recipe collections in JSON Lines or CSV format that creates '
+        'one Recipe entry per record.'
+    ),
+    mainfile_name_re=r'.*\.recipes\.(jsonl|csv)',
+    mainfile_mime_re=r'(text/.*|application/(json|x-ndjson))',
+    # a JSON object with a recipe name or steps or a CSV header with a name column
+    mainfile_contents_re=(
+        r'\A\ufeff?\s*(\{[\s\S]*?"(name|steps)"\s*:|([^\r\n,]*,)*"?name"?\s*(,|\r?\n))'
+    ),
+)
+
+
+class FDCParserEntryPoint(ParserEntryPoint):
+    def load(self):
+        from nomad_tajine_plugin.parsers.fdc_parser import FDCParser
+
+        return FDCParser(**self.model_dump())
+
+
+fdc_parser_entry_point = FDCParserEntryPoint(
+    name='FDCParser',
+    description=(
+        'Parser for USDA FoodData Central bulk downloads in JSON or CSV format that '
+        'creates one Ingredient entry per food.'
+    ),
+    mainfile_name_re=r'(.*/)?(food\.csv|[^/]*\.json)',
+    mainfile_mime_re=r'(text/.*|application/json)',
+    # the foods array of the JSON download or the header of food.csv
+    mainfile_contents_re=(
+        r'\A\ufeff?\s*(\{\s*"(SRLegacyFoods|FoundationFoods)"\s*:'
+        r'|"?fdc_id"?,"?data_type"?,)'
+    ),
+)
+
 
+class JSONLDRecipeParserEntryPoint(ParserEntryPoint):
     def load(self):
-        from nomad_tajine_plugin.parsers.parser import NewParser
+        from nomad_tajine_plugin.parsers.jsonld_parser import JSONLDRecipeParser
 
-        return NewParser(**self.model_dump())
+        return JSONLDRecipeParser(**self.model_dump())
 
 
-parser_entry_point = NewParserEntryPoint(
-    name='NewParser',
-    description='New parser entry point configuration.',
-    mainfile_name_re=r'.*\.newmainfilename',
+jsonld_parser_entry_point = JSONLDRecipeParserEntryPoint(
+    name='JSONLDRecipeParser',
+    description=(
+        'Parser for schema.org Recipe JSON-LD in web pages or JSON files that '
+        'creates one Recipe entry per recipe.'
+    ),
+    mainfile_name_re=r'.*\.(html?|jsonld|json)',
+    mainfile_mime_re=r'(text/.*|application/(json|ld\+json|xhtml\+xml))',
+    # an HTML page or a JSON-LD document
+    mainfile_contents_re=(
+        r'(?i)\A\ufeff?\s*(<!doctype\s+html|<html|<head|<!--|<\?xml'
+        r'|\[?\s*\{\s*"@(context|type|graph)")'
+    ),
 )
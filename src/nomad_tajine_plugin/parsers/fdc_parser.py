@@ -0,0 +1,251 @@
+import csv
+import json
+import os
+from collections.abc import Iterable, Iterator
+from typing import (
+    TYPE_CHECKING,
+    TextIO,
+)
+
+if TYPE_CHECKING:
+    from nomad.datamodel.datamodel import (
+        EntryArchive,
+    )
+    from structlog.stdlib import (
+        BoundLogger,
+    )
+
+from nomad.parsing.parser import MatchingParser
+
+from nomad_tajine_plugin.schema_packages.schema_package import (
+    Ingredient,
+    format_lab_id,
+)
+from nomad_tajine_plugin.schema_packages.usda_lookup.usda_lookup import (
+    FOOD_CATEGORY_CLASSIFICATION,
+    calorie_id,
+    carb_id,
+    fat_id,
+    protein_id,
+)
+
+FDC_JSON_KEYS = ('SRLegacyFoods', 'FoundationFoods')
+# FoundationFoods often report energy only by Atwater factors, the first nutrient
+# listed for a quantity that a food reports is used
+NUTRIENT_IDS = {
+    protein_id: 'protein_per_100_g',
+    fat_id: 'fat_per_100_g',
+    carb_id: 'carbohydrates_per_100_g',
+    calorie_id: 'calories_per_100_g',
+    2048: 'calories_per_100_g',  # Energy (Atwater Specific Factors)
+    2047: 'calories_per_100_g',  # Energy (Atwater General Factors)
+}
+CHUNK_SIZE = 1 << 16
+
+
+def find_json_array(f: TextIO, keys: Iterable[str]) -> tuple[str, int] | None:
+    """
+    Reads the file up to the start of the first array stored under one of the
+    given keys. Returns the read buffer and the position after the opening bracket.
+    """
+    buffer = ''
+    while True:
+        chunk = f.read(CHUNK_SIZE)
+        if not chunk:
+            return None
+        buffer += chunk
+        starts = [buffer.find(f'"{key}"') for key in keys]
+        starts = [start for start in starts if start >= 0]
+        if starts:
+            position = buffer.find('[', min(starts))
+            if position >= 0:
+                return buffer, position + 1
+        else:
+            # keep the tail in case a key is split between chunks
+            buffer = buffer[-64:]
+
+
+def iter_json_array(f: TextIO, keys: Iterable[str]) -> Iterator[dict]:
+    """
+    Yields the items of the first array stored under one of the given keys of a
+    JSON object, decoding one item at a time from a buffer of a few chunks.
+    """
+    start = find_json_array(f, keys)
+    if start is None:
+        return
+    buffer, position = start
+    decoder = json.JSONDecoder()
+    while True:
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position < len(buffer):
+                break
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            buffer, position = chunk, 0
+        if buffer[position] == ']':
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                raise
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        yield item
+        buffer, position = buffer[end:], 0
+
+
+def select_nutrients(amounts: dict[int, float]) -> dict[str, float]:
+    """
+    Maps the amounts of a food by nutrient ID onto the `Ingredient` quantities,
+    preferring the nutrients listed first in `NUTRIENT_IDS`.
+    """
+    nutrients = {}
+    for nutrient_id, name in NUTRIENT_IDS.items():
+        if name not in nutrients and amounts.get(nutrient_id) is not None:
+            nutrients[name] = amounts[nutrient_id]
+    return nutrients
+
+
+def ingredient_from_food(
+    fdc_id: int,
+    description: str,
+    food_category: str | None,
+    ndb_id: int | None,
+    nutrients: dict[str, float],
+) -> Ingredient:
+    food_category = food_category or 'Unknown'
+    return Ingredient(
+        name=description,
+        lab_id=format_lab_id(description),
+        fdc_id=fdc_id,
+        ndb_id=ndb_id,
+        diet_type=FOOD_CATEGORY_CLASSIFICATION.get(food_category, 'ambiguous'),
+        **nutrients,
+    )
+
+
+def iter_json_foods(mainfile: str) -> Iterator[Ingredient]:
+    with open(mainfile, encoding='utf-8') as f:
+        for food in iter_json_array(f, FDC_JSON_KEYS):
+            amounts = {}
+            for food_nutrient in food.get('foodNutrients', []):
+                nutrient_id = food_nutrient.get('nutrient', {}).get('id')
+                if nutrient_id in NUTRIENT_IDS:
+                    amounts[nutrient_id] = food_nutrient.get('amount')
+            ndb_id = food.get('ndbNumber')
+            yield ingredient_from_food(
+                food['fdcId'],
+                food.get('description'),
+                (food.get('foodCategory') or {}).get('description'),
+                int(ndb_id) if ndb_id else None,
+                select_nutrients(amounts),
+            )
+
+
+def iter_csv_rows(path: str) -> Iterator[dict[str, str]]:
+    if not os.path.exists(path):
+        return
+    with open(path, encoding='utf-8', newline='') as f:
+        yield from csv.DictReader(f)
+
+
+def iter_csv_foods(mainfile: str) -> Iterator[Ingredient]:
+    """
+    Yields the foods of the `food.csv` table of an FDC CSV download. The food
+    categories, NDB numbers and the used nutrients are read row by row from the
+    sibling tables first, keeping only the four nutrients of each food.
+    """
+    directory = os.path.dirname(mainfile)
+    categories = {
+        row['id']: row['description']
+        for row in iter_csv_rows(os.path.join(directory, 'food_category.csv'))
+    }
+    ndb_ids = {
+        row['fdc_id']: int(row['NDB_number'])
+        for row in iter_csv_rows(os.path.join(directory, 'sr_legacy_food.csv'))
+        if row.get('NDB_number')
+    }
+    amounts: dict[str, dict[int, float]] = {}
+    nutrient_ids = {str(nutrient_id): nutrient_id for nutrient_id in NUTRIENT_IDS}
+    for row in iter_csv_rows(os.path.join(directory, 'food_nutrient.csv')):
+        nutrient_id = nutrient_ids.get(row['nutrient_id'])
+        if nutrient_id is not None and row.get('amount'):
+            amounts.setdefault(row['fdc_id'], {})[nutrient_id] = float(row['amount'])
+
+    for row in iter_csv_rows(mainfile):
+        yield ingredient_from_food(
+            int(row['fdc_id']),
+            row['description'],
+            categories.get(row.get('food_category_id')),
+            ndb_ids.get(row['fdc_id']),
+            select_nutrients(amounts.get(row['fdc_id'], {})),
+        )
+
+
+def iter_fdc_ids(mainfile: str) -> Iterator[str]:
+    if mainfile.endswith('.csv'):
+        for row in iter_csv_rows(mainfile):
+            yield row['fdc_id']
+        return
+    with open(mainfile, encoding='utf-8') as f:
+        for food in iter_json_array(f, FDC_JSON_KEYS):
+            yield str(food['fdcId'])
+
+
+class FDCParser(MatchingParser):
+    """
+    Parses the bulk downloads of USDA FoodData Central, either the JSON file or the
+    `food.csv` table of the CSV download next to its `food_nutrient.csv`,
+    `food_category.csv` and `sr_legacy_food.csv` tables. Every food is parsed into
+    the `Ingredient` data of its own child entry keyed by its FDC ID.
+    """
+
+    creates_children = True
+
+    def is_mainfile(
+        self,
+        filename: str,
+        mime: str,
+        buffer: bytes,
+        decoded_buffer: str,
+        compression: str | None = None,
+    ) -> bool | Iterable[str]:
+        is_mainfile = super().is_mainfile(
+            filename, mime, buffer, decoded_buffer, compression
+        )
+        if not is_mainfile:
+            return is_mainfile
+        try:
+            keys = list(iter_fdc_ids(filename))
+        except (OSError, ValueError, KeyError, csv.Error):
+            return False
+        # a file without foods would only create an empty entry
+        return keys or False
+
+    def parse(
+        self,
+        mainfile: str,
+        archive: 'EntryArchive',
+        logger: 'BoundLogger',
+        child_archives: dict[str, 'EntryArchive'] = None,
+    ) -> None:
+        child_archives = child_archives or {}
+        foods = iter_csv_foods if mainfile.endswith('.csv') else iter_json_foods
+        number_of_ingredients = 0
+        for ingredient in foods(mainfile):
+            child_archive = child_archives.get(str(ingredient.fdc_id))
+            if child_archive is None:
+                continue
+            child_archive.data = ingredient
+            number_of_ingredients += 1
+
+        logger.info(
+            'Parsed FoodData Central foods.',
+            number_of_ingredients=number_of_ingredients,
+        )
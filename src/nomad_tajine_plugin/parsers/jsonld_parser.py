@@ -0,0 +1,371 @@
+import html
+import json
+import re
+import time
+from collections.abc import Iterable, Iterator
+from typing import (
+    TYPE_CHECKING,
+)
+
+if TYPE_CHECKING:
+    from nomad.datamodel.datamodel import (
+        EntryArchive,
+    )
+    from structlog.stdlib import (
+        BoundLogger,
+    )
+
+from nomad.parsing.parser import MatchingParser
+
+from nomad_tajine_plugin.schema_packages.schema_package import (
+    IngredientAmount,
+    IngredientPiece,
+    IngredientVolume,
+    Recipe,
+    RecipeStep,
+)
+
+JSONLD_SCRIPT_RE = re.compile(
+    rb'<script[^>]*?type\s*=\s*["\']?application/ld\+json["\']?[^>]*>(.*?)</script>',
+    re.IGNORECASE | re.DOTALL,
+)
+DURATION_RE = re.compile(
+    r'P(?:(\d+(?:\.\d+)?)D)?'
+    r'(?:T(?:(\d+(?:\.\d+)?)H)?(?:(\d+(?:\.\d+)?)M)?(?:(\d+(?:\.\d+)?)S)?)?$'
+)
+INTEGER_RE = re.compile(r'\d+')
+
+UNICODE_FRACTIONS = {
+    '½': 0.5,
+    '⅓': 1 / 3,
+    '⅔': 2 / 3,
+    '¼': 0.25,
+    '¾': 0.75,
+    '⅕': 0.2,
+    '⅛': 0.125,
+}
+MASS_UNITS = {
+    'mg': 0.001,
+    'g': 1.0,
+    'gr': 1.0,
+    'gram': 1.0,
+    'kg': 1000.0,
+    'kilogram': 1000.0,
+    'oz': 28.3495,
+    'ounce': 28.3495,
+    'lb': 453.592,
+    'pound': 453.592,
+}
+VOLUME_UNITS = {
+    'ml': 1.0,
+    'milliliter': 1.0,
+    'millilitre': 1.0,
+    'cl': 10.0,
+    'dl': 100.0,
+    'l': 1000.0,
+    'liter': 1000.0,
+    'litre': 1000.0,
+    'tsp': 4.92892,
+    'teaspoon': 4.92892,
+    'tbsp': 14.7868,
+    'tablespoon': 14.7868,
+    'cup': 236.588,
+    'pint': 473.176,
+    'quart': 946.353,
+    'pinch': 0.31,
+    'dash': 0.62,
+}
+PIECE_UNITS = {
+    'piece',
+    'clove',
+    'slice',
+    'can',
+    'stick',
+    'sprig',
+    'bunch',
+    'head',
+    'leaf',
+    'whole',
+}
+# plurals of the units that are not formed by appending an `s`
+UNIT_PLURALS = {
+    'pinches': 'pinch',
+    'dashes': 'dash',
+    'bunches': 'bunch',
+    'leaves': 'leaf',
+}
+NUMBER = r'(?:(?:\d+\s+\d+/\d+|\d+/\d+|\d+(?:[.,]\d+)?)\s*[½⅓⅔¼¾⅕⅛]?|[½⅓⅔¼¾⅕⅛])'
+INGREDIENT_LINE_RE = re.compile(
+    rf'^\s*(?P<amount>(?:{NUMBER}(?:\s*(?:-|–|to\b)\s*{NUMBER})?)?)\s*'
+    r'(?P<unit>fl\.?\s*oz|[a-zA-Z]+\.?)?\s*(?P<name>.*)$'
+)
+
+
+def iter_jsonld_blocks(content: bytes) -> Iterator[object]:
+    """
+    Yields the decoded JSON-LD blocks of an HTML page or the document of a JSON
+    file. HTML pages are only scanned for `application/ld+json` script elements
+    without parsing the DOM. Blocks that are not valid JSON are skipped.
+    """
+    stripped = content.lstrip()
+    if stripped[:1] in (b'{', b'['):
+        blocks = [stripped]
+    else:
+        blocks = JSONLD_SCRIPT_RE.findall(content)
+    for block in blocks:
+        try:
+            yield json.loads(block)
+        except ValueError:
+            continue
+
+
+def is_recipe(node: dict) -> bool:
+    types = node.get('@type')
+    if isinstance(types, str):
+        types = [types]
+    return isinstance(types, list) and 'Recipe' in types
+
+
+def find_recipes(node: object) -> Iterator[dict]:
+    """
+    Yields all schema.org `Recipe` objects of a JSON-LD document, including the
+    ones nested in lists and `@graph` arrays.
+    """
+    if isinstance(node, list):
+        for item in node:
+            yield from find_recipes(item)
+    elif isinstance(node, dict):
+        if is_recipe(node):
+            yield node
+            return
+        for value in node.values():
+            if isinstance(value, list | dict):
+                yield from find_recipes(value)
+
+
+def parse_number(text: str) -> float | None:
+    text = text.strip().replace(',', '.')
+    if not text:
+        return None
+    value = 0.0
+    if text[-1] in UNICODE_FRACTIONS:
+        value, text = UNICODE_FRACTIONS[text[-1]], text[:-1].strip()
+    for part in text.split():
+        if '/' in part:
+            numerator, denominator = part.split('/')
+            value += float(numerator) / float(denominator)
+        else:
+            value += float(part)
+    return value
+
+
+def parse_amount(text: str) -> float | None:
+    """
+    Parses amounts like `2`, `1 1/2`, `½`, `0,5` and ranges like `2-3`, taking
+    the mean of a range.
+    """
+    values = [parse_number(part) for part in re.split(r'\s*(?:-|–|\bto\b)\s*', text)]
+    values = [value for value in values if value is not None]
+    return sum(values) / len(values) if values else None
+
+
+def clean_ingredient_name(name: str) -> str:
+    name = re.sub(r'\([^)]*\)', '', name)
+    name = name.split(',')[0]
+    name = re.sub(r'^\s*of\s+|\bto taste\b', '', name)
+    return ' '.join(name.split())
+
+
+def parse_ingredient_line(line: str) -> IngredientAmount:
+    """
+    Parses a free-text ingredient line like `2 tbsp olive oil` into an ingredient.
+    Amounts with mass units are given as mass, volume units as volume and amounts
+    without a known unit as pieces. Lines without an amount only keep the name.
+    """
+    line = re.sub(r'^\s*an?\s+', '1 ', html.unescape(line), flags=re.IGNORECASE)
+    match = INGREDIENT_LINE_RE.match(line)
+    amount = parse_amount(match['amount']) if match['amount'].strip() else None
+    unit = (match['unit'] or '').lower().rstrip('.').replace(' ', '')
+    name = match['name']
+    singular = UNIT_PLURALS.get(unit, unit.removesuffix('s'))
+    if amount is None:
+        return IngredientAmount(name=clean_ingredient_name(line))
+    if unit in ('floz', 'fl.oz'):
+        return IngredientVolume(
+            name=clean_ingredient_name(name), volume=amount * 29.5735
+        )
+    for units in (MASS_UNITS, VOLUME_UNITS):
+        factor = units.get(unit, units.get(singular))
+        if factor is None:
+            continue
+        if units is MASS_UNITS:
+            return IngredientAmount(
+                name=clean_ingredient_name(name), mass=amount * factor
+            )
+        return IngredientVolume(
+            name=clean_ingredient_name(name), volume=amount * factor
+        )
+    if unit and singular not in PIECE_UNITS:
+        # the word after the amount is part of the name, e.g. `3 eggs`
+        name = f'{match["unit"]} {name}'
+    return IngredientPiece(name=clean_ingredient_name(name), pieces=amount)
+
+
+def parse_duration(value: object) -> float | None:
+    """
+    Parses an ISO 8601 duration like `PT1H30M` into minutes.
+    """
+    if not isinstance(value, str):
+        return None
+    match = DURATION_RE.match(value.strip())
+    if not match or not any(match.groups()):
+        return None
+    days, hours, minutes, seconds = (float(group or 0) for group in match.groups())
+    return days * 1440 + hours * 60 + minutes + seconds / 60
+
+
+def as_text(value: object) -> str | None:
+    if isinstance(value, list):
+        texts = [as_text(item) for item in value]
+        return ', '.join(text for text in texts if text) or None
+    if isinstance(value, dict):
+        return as_text(value.get('name') or value.get('text'))
+    if value is None:
+        return None
+    return html.unescape(str(value)).strip() or None
+
+
+def iter_instructions(value: object) -> Iterator[dict]:
+    """
+    Yields the `HowToStep`s of `recipeInstructions` given as text, a list of texts
+    or steps, or `HowToSection`s of steps.
+    """
+    if isinstance(value, str):
+        for line in value.splitlines():
+            if line.strip():
+                yield {'text': line}
+    elif isinstance(value, list):
+        for item in value:
+            yield from iter_instructions(item)
+    elif isinstance(value, dict):
+        if 'itemListElement' in value:
+            yield from iter_instructions(value['itemListElement'])
+        else:
+            yield value
+
+
+def recipe_from_jsonld(node: dict) -> Recipe:
+    """
+    Maps a schema.org `Recipe` onto a `Recipe` section. The ingredients are added to
+    the first step mentioning them, or to the first step.
+    """
+    recipe = Recipe(
+        name=as_text(node.get('name')),
+        summary=as_text(node.get('description')),
+        cuisine=as_text(node.get('recipeCuisine')),
+        authors=as_text(node.get('author')),
+    )
+    servings = INTEGER_RE.search(as_text(node.get('recipeYield')) or '')
+    if servings:
+        recipe.number_of_servings = int(servings.group())
+
+    steps = []
+    for instruction in iter_instructions(node.get('recipeInstructions')):
+        step = RecipeStep(instruction=as_text(instruction.get('text')))
+        step.duration = parse_duration(
+            instruction.get('totalTime') or instruction.get('timeRequired')
+        )
+        steps.append(step)
+    if not steps:
+        steps.append(RecipeStep())
+    total_time = parse_duration(node.get('totalTime'))
+    if total_time is not None and all(step.duration is None for step in steps):
+        for step in steps:
+            step.duration = total_time / len(steps)
+
+    lines = node.get('recipeIngredient') or node.get('ingredients') or []
+    for line in [lines] if isinstance(lines, str) else lines:
+        ingredient = parse_ingredient_line(str(line))
+        if not ingredient.name:
+            continue
+        name = ingredient.name.lower()
+        step = next(
+            (step for step in steps if name in (step.instruction or '').lower()),
+            steps[0],
+        )
+        step.ingredients.append(ingredient)
+    recipe.steps.extend(steps)
+    return recipe
+
+
+def read_recipes(mainfile: str) -> tuple[list[dict], int]:
+    with open(mainfile, 'rb') as f:
+        content = f.read()
+    if b'Recipe' not in content:
+        return [], len(content)
+    recipes = [
+        recipe
+        for block in iter_jsonld_blocks(content)
+        for recipe in find_recipes(block)
+    ]
+    return recipes, len(content)
+
+
+class JSONLDRecipeParser(MatchingParser):
+    """
+    Imports the schema.org `Recipe` JSON-LD of crawled web pages or JSON files.
+    Every recipe found in a file is parsed into the `Recipe` data of its own child
+    entry.
+    """
+
+    creates_children = True
+
+    def is_mainfile(
+        self,
+        filename: str,
+        mime: str,
+        buffer: bytes,
+        decoded_buffer: str,
+        compression: str | None = None,
+    ) -> bool | Iterable[str]:
+        is_mainfile = super().is_mainfile(
+            filename, mime, buffer, decoded_buffer, compression
+        )
+        if not is_mainfile:
+            return is_mainfile
+        try:
+            recipes, _ = read_recipes(filename)
+        except OSError:
+            return False
+        return [str(index) for index in range(len(recipes))]
+
+    def parse(
+        self,
+        mainfile: str,
+        archive: 'EntryArchive',
+        logger: 'BoundLogger',
+        child_archives: dict[str, 'EntryArchive'] = None,
+    ) -> None:
+        child_archives = child_archives or {}
+        start = time.perf_counter()
+        recipes, size = read_recipes(mainfile)
+        number_of_recipes = 0
+        for index, node in enumerate(recipes):
+            child_archive = child_archives.get(str(index))
+            if child_archive is None:
+                continue
+            try:
+                child_archive.data = recipe_from_jsonld(node)
+            except Exception as e:
+                logger.error('Could not import recipe.', recipe=index, exc_info=e)
+                continue
+            number_of_recipes += 1
+
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        logger.info(
+            'Imported schema.org recipes.',
+            number_of_recipes=number_of_recipes,
+            seconds=elapsed,
+            recipes_per_second=number_of_recipes / elapsed,
+            megabytes_per_second=size / elapsed / 1e6,
+        )
@@ -1,3 +1,6 @@
+import csv
+import json
+from collections.abc import Iterable, Iterator
 from typing import (
     TYPE_CHECKING,
 )
@@ -10,16 +13,91 @@ if TYPE_CHECKING:
         BoundLogger,
     )
 
-from nomad.config import config
-from nomad.datamodel.metainfo.workflow import Workflow
+from nomad.metainfo.data_type import Number
 from nomad.parsing.parser import MatchingParser
 
-configuration = config.get_plugin_entry_point(
-    'nomad_tajine_plugin.parsers:parser_entry_point'
-)
+from nomad_tajine_plugin.schema_packages.schema_package import Recipe
+
+SUBSECTION_COLUMNS = ('steps',)
+
+
+def iter_raw_records(mainfile: str) -> Iterator[str | dict[str, str]]:
+    """
+    Yields the records of a recipe collection one at a time without decoding them:
+    the non-empty lines of a JSON Lines file or the rows of a CSV file.
+    """
+    # the contents pattern of the entry point accepts a byte order mark
+    with open(mainfile, encoding='utf-8-sig', newline='') as f:
+        if mainfile.endswith('.csv'):
+            yield from csv.DictReader(f)
+            return
+        for line in f:
+            if line.strip():
+                yield line
+
+
+def record_from_row(row: dict[str, str]) -> dict:
+    """
+    Converts a CSV row into a recipe dict. Columns are named after the `Recipe`
+    quantities, subsections like `steps` are given as JSON, numbers are converted
+    to the type of their quantity and empty cells are skipped.
+    """
+    quantities = Recipe.m_def.all_quantities
+    record = {}
+    for column, value in row.items():
+        if column is None or not value:
+            continue
+        if column in SUBSECTION_COLUMNS:
+            record[column] = json.loads(value)
+        elif column in quantities:
+            quantity_type = quantities[column].type
+            record[column] = (
+                quantity_type.normalize(value)
+                if isinstance(quantity_type, Number)
+                else value
+            )
+    return record
 
 
-class NewParser(MatchingParser):
+def record_from_raw(raw: str | dict[str, str]) -> dict:
+    if isinstance(raw, dict):
+        return record_from_row(raw)
+    record = json.loads(raw)
+    # records may be given as full archives or only as their data section
+    record = record.get('data', record)
+    record.pop('m_def', None)
+    return record
+
+
+class RecipeCollectionParser(MatchingParser):
+    """
+    Parses collections of recipes given as JSON Lines or CSV files. Every record is
+    parsed into the `Recipe` data of its own child entry. The file is read record by
+    record, so only one record is held in memory at a time.
+    """
+
+    creates_children = True
+
+    def is_mainfile(
+        self,
+        filename: str,
+        mime: str,
+        buffer: bytes,
+        decoded_buffer: str,
+        compression: str | None = None,
+    ) -> bool | Iterable[str]:
+        is_mainfile = super().is_mainfile(
+            filename, mime, buffer, decoded_buffer, compression
+        )
+        if not is_mainfile:
+            return is_mainfile
+        try:
+            keys = [str(index) for index, _ in enumerate(iter_raw_records(filename))]
+        except (OSError, UnicodeDecodeError, csv.Error):
+            return False
+        # a file without records would only create an empty entry
+        return keys or False
+
     def parse(
         self,
         mainfile: str,
@@ -27,6 +105,21 @@ class NewParser(MatchingParser):
         logger: 'BoundLogger',
         child_archives: dict[str, 'EntryArchive'] = None,
     ) -> None:
-        logger.info('NewParser.parse', parameter=configuration.parameter)
+        child_archives = child_archives or {}
+        number_of_recipes = 0
+        for index, raw in enumerate(iter_raw_records(mainfile)):
+            child_archive = child_archives.get(str(index))
+            if child_archive is None:
+                continue
+            try:
+                child_archive.data = Recipe.m_from_dict(record_from_raw(raw))
+            except Exception as e:
+                logger.error('Could not parse recipe record.', record=index, exc_info=e)
+                continue
+            number_of_recipes += 1
 
-        archive.workflow2 = Workflow(name='test')
+        logger.info(
+            'Parsed recipe collection.',
+            number_of_recipes=number_of_recipes,
+            number_of_records=len(child_archives),
+        )
@@ -1,9 +1,79 @@
 from nomad.config.models.plugins import SchemaPackageEntryPoint
-from pydantic import Field
+from pydantic import Field, model_validator
 
 
 class TajineSchemaPackageEntryPoint(SchemaPackageEntryPoint):
     usda_api_key: str = Field('', description='API key for USDA FoodData Central API')
+    usda_api_url: str = Field(
+        'https://api.nal.usda.gov/fdc/v1',
+        description='Base URL of the USDA FoodData Central API.',
+    )
+    usda_timeout: float = Field(
+        30.0,
+        description='Timeout in seconds of requests to the FoodData Central API.',
+    )
+    parallel_normalization: bool = Field(
+        False,
+        description=(
+            'Search the Ingredient entries referenced by the steps of a recipe '
+            'concurrently in threads. Ingredients with a given reference, loading '
+            'the found entries and creating the missing ones are still handled one '
+            'after another on the normalizing thread.'
+        ),
+    )
+    normalization_workers: int = Field(
+        8,
+        description='Maximum number of threads used with `parallel_normalization`.',
+    )
+    compact_archives: bool = Field(
+        False,
+        description=(
+            'Store lightweight ingredient and tool rows in the recipe aggregate '
+            'instead of full copies of the step subsections.'
+        ),
+    )
+    compact_generated_entries: bool = Field(
+        False,
+        description=(
+            'Write the Ingredient and scaled Recipe entries created by the plugin '
+            'as minified JSON.'
+        ),
+    )
+    minhash_permutations: int = Field(
+        64,
+        description='Length of the MinHash signature over the ingredients of a recipe.',
+    )
+    minhash_bands: int = Field(
+        16,
+        description=(
+            'Number of LSH bands the signature is split into, each stored as a '
+            'similarity key. Must divide `minhash_permutations`.'
+        ),
+    )
+    trace_normalization: bool = Field(
+        False,
+        description=(
+            'Log a timing span with the section path and counts for every '
+            'normalized ingredient, recipe and recipe scaler at debug level.'
+        ),
+    )
+    slow_normalization_threshold: float | None = Field(
+        30.0,
+        description=(
+            'Log a summary of the spans of an entry whose normalization takes at '
+            'least this many seconds. Disabled if not set.'
+        ),
+    )
+
+    @model_validator(mode='after')
+    def check_minhash_bands(self):
+        if not 0 < self.minhash_bands <= self.minhash_permutations:
+            raise ValueError(
+                'minhash_bands must be positive and at most minhash_permutations'
+            )
+        if self.minhash_permutations % self.minhash_bands:
+            raise ValueError('minhash_bands must divide minhash_permutations')
+        return self
 
     def load(self):
         from nomad_tajine_plugin.schema_packages.schema_package import m_package
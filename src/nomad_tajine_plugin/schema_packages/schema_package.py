@@ -1,7 +1,12 @@
+import functools
+import itertools
+import json
 import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import TYPE_CHECKING
 
-from nomad.config import config
+import numpy as np
 from nomad.datamodel.data import ArchiveSection, Schema, UseCaseElnCategory
 from nomad.datamodel.metainfo.annotations import ELNAnnotation, ELNComponentEnum
 from nomad.datamodel.metainfo.basesections import (
@@ -9,12 +14,25 @@ from nomad.datamodel.metainfo.basesections import (
     Entity,
     EntityReference,
 )
-from nomad.metainfo import MEnum, Quantity, SchemaPackage
+from nomad.metainfo import MEnum, MProxy, Quantity, SchemaPackage
 from nomad.metainfo.metainfo import Section, SubSection
 from nomad.units import ureg
 
 from nomad_tajine_plugin.schema_packages.usda_lookup.usda_lookup import get_usda_data
-from nomad_tajine_plugin.utils import create_archive
+from nomad_tajine_plugin.similarity import lsh_band_keys, minhash_signature
+from nomad_tajine_plugin.utils import (
+    BufferedLogger,
+    LazyEntryPoint,
+    create_archive,
+    create_archives,
+    find_archive,
+    get_entry_hashes,
+    get_entry_id_from_reference,
+    parse_reference,
+    pop_trace_summary,
+    read_archive_data,
+    trace_span,
+)
 
 if TYPE_CHECKING:
     from nomad.datamodel.datamodel import (
@@ -25,17 +43,93 @@ if TYPE_CHECKING:
     )
 
 
-configuration = config.get_plugin_entry_point(
+configuration = LazyEntryPoint(
     'nomad_tajine_plugin.schema_packages:schema_tajine_entry_point'
 )
 
 m_package = SchemaPackage()
 
+NUTRIENTS = ('calories', 'fat', 'protein', 'carbohydrates')
+
 
 def format_lab_id(lab_id: str):
     return lab_id.lower().replace(' ', '_').replace(',', '')
 
 
+def combine_diet_types(diet_types: list[str | None]) -> str:
+    """
+    Returns the diet type of a combination of ingredients or recipes.
+    """
+    diet_types = [(diet_type or 'ambiguous') for diet_type in diet_types]
+    if not diet_types:
+        return 'ambiguous'
+    elif 'omnivorous' in diet_types:
+        return 'omnivorous'
+    elif all(d == 'vegan' for d in diet_types):
+        return 'vegan'
+    elif 'vegetarian' in diet_types:
+        return 'vegetarian'
+    return 'ambiguous'
+
+
+def sum_quantity(sections: list[ArchiveSection], name: str):
+    values = [getattr(section, name) for section in sections]
+    values = [value for value in values if value is not None]
+    return sum(values) if values else None
+
+
+def span(
+    archive: 'EntryArchive',
+    logger: 'BoundLogger',
+    name: str,
+    section: ArchiveSection | None = None,
+    **counts,
+):
+    return trace_span(
+        archive,
+        logger,
+        name,
+        section,
+        log=configuration.trace_normalization,
+        **counts,
+    )
+
+
+def traced(counts: Callable[[ArchiveSection], dict] | None = None):
+    """
+    Records a span for the decorated `normalize` method, with the counts returned by
+    `counts` for the normalized section. Overridden methods calling `super()` are
+    recorded once, by the name of the section's class. Once the entry's root
+    section is normalized, a summary of all spans is logged if the normalization
+    was slow.
+    """
+
+    def decorator(normalize):
+        @functools.wraps(normalize)
+        def wrapper(self, archive: 'EntryArchive', logger: 'BoundLogger'):
+            if getattr(self, '_traced', False):
+                return normalize(self, archive, logger)
+            self._traced = True
+            try:
+                name = f'{type(self).__name__}.normalize'
+                with span(archive, logger, name, self) as record:
+                    normalize(self, archive, logger)
+                    if counts is not None:
+                        record.update(counts(self))
+            finally:
+                self._traced = False
+            if self is archive.data:
+                summary = pop_trace_summary(
+                    archive, configuration.slow_normalization_threshold
+                )
+                if summary is not None:
+                    logger.warning('Slow normalization.', **summary)
+
+        return wrapper
+
+    return decorator
+
+
 class Ingredient(Entity, Schema):
     """
     An ingredient used in cooking recipes.
@@ -107,6 +201,7 @@ class Ingredient(Entity, Schema):
         a_eln=ELNAnnotation(component=ELNComponentEnum.NumberEditQuantity),
     )
 
+    @traced()
     def normalize(self, archive: 'EntryArchive', logger: 'BoundLogger'):
         if not self.lab_id:
             if self.name:
@@ -114,7 +209,18 @@ class Ingredient(Entity, Schema):
         else:
             self.lab_id = format_lab_id(self.lab_id)
 
-        usda_query_result = get_usda_data(self.name, configuration.usda_api_key)
+        # ingredients imported from or already matched with FoodData Central keep
+        # their identifiers and nutrients
+        if self.fdc_id is not None:
+            usda_query_result = None
+        else:
+            with span(archive, logger, 'usda_lookup', self):
+                usda_query_result = get_usda_data(
+                    self.name,
+                    configuration.usda_api_key,
+                    api_url=configuration.usda_api_url,
+                    timeout=configuration.usda_timeout,
+                )
         if usda_query_result:
             self.protein_per_100_g = usda_query_result.get('protein')
             self.fat_per_100_g = usda_query_result.get('fat')
@@ -199,7 +305,7 @@ class IngredientAmount(EntityReference):
     )
 
     def calculate_nutrients(self, logger):
-        for nutrient in ('calories', 'fat', 'protein', 'carbohydrates'):
+        for nutrient in NUTRIENTS:
             try:
                 per_100_g_attr = f'{nutrient}_per_100_g'
                 value_per_100_g = getattr(self.reference, per_100_g_attr)
@@ -213,11 +319,22 @@ class IngredientAmount(EntityReference):
                     exc_info=True,
                 )
 
-    def normalize(self, archive: 'EntryArchive', logger: 'BoundLogger'):
+    def new_ingredient_entry(self) -> tuple[Ingredient, str]:
+        """
+        Returns a new Ingredient entry for this ingredient and its file name.
+        """
+        ingredient = Ingredient(
+            name=self.name,
+            lab_id=self.lab_id,
+        )
+        return ingredient, f'{self.lab_id}.archive.json'
+
+    def resolve_reference(
+        self, archive: 'EntryArchive', logger: 'BoundLogger', create: bool = True
+    ):
         """
         For the given ingredient name or ID, fetches the corresponding Ingredient entry.
-        If not found, creates a new Ingredient entry. Converts the quantity to SI units
-        based on the unit and ingredient properties like density or weight per piece.
+        If not found and `create` is set, creates a new Ingredient entry.
         """
         if not self.lab_id:
             if self.name:
@@ -225,33 +342,55 @@ class IngredientAmount(EntityReference):
         else:
             self.lab_id = format_lab_id(self.lab_id)
 
-        super().normalize(archive, logger)
+        with span(archive, logger, 'reference_search', self):
+            super().normalize(archive, logger)
         if (
             not self.reference
             and self.lab_id
             and hasattr(archive.data, '_normalization_delay')
         ):  # Wait and search again for ingredient if _normalization_delay is set
-            time.sleep(archive.data._normalization_delay)
-            super().normalize(archive, logger)
+            with span(archive, logger, 'wait', self):
+                time.sleep(archive.data._normalization_delay)
+            with span(archive, logger, 'reference_search', self):
+                super().normalize(archive, logger)
 
-        if not self.reference and self.lab_id:
+        if create and not self.reference and self.lab_id:
             logger.debug('Ingredient entry not found. Creating a new one.')
             try:
-                ingredient = Ingredient(
-                    name=self.name,
-                    lab_id=self.lab_id,
-                )
-                self.reference = create_archive(
-                    ingredient,
-                    archive,
-                    f'{self.lab_id}.archive.json',
-                    overwrite=False,
-                )
+                ingredient, file_name = self.new_ingredient_entry()
+                with span(archive, logger, 'create_entries', self, count=1):
+                    self.reference = create_archive(
+                        ingredient,
+                        archive,
+                        file_name,
+                        overwrite=False,
+                        compact=configuration.compact_generated_entries,
+                    )
             except Exception as e:
                 logger.error(
                     'Failed to create Ingredient entry.', exc_info=True, error=e
                 )
 
+    @traced()
+    def normalize(self, archive: 'EntryArchive', logger: 'BoundLogger'):
+        """
+        Resolves the Ingredient entry and converts the quantity to SI units based on
+        the unit and ingredient properties like density or weight per piece.
+
+        With `parallel_normalization` configured, the references of all ingredients
+        in the steps of a recipe are resolved together by the recipe.
+        """
+        recipe = archive.data
+        if (
+            configuration.parallel_normalization
+            and isinstance(recipe, Recipe)
+            and isinstance(self.m_parent, RecipeStep)
+            and self.m_parent.m_parent is recipe
+        ):
+            recipe.resolve_ingredients(archive, logger)
+        else:
+            self.resolve_reference(archive, logger)
+
         if self.reference:
             self.diet_type = self.reference.diet_type
             if self.mass:
@@ -274,6 +413,7 @@ class IngredientVolume(IngredientAmount):
         description='The mass of the ingredient that should be used.',
     )
 
+    @traced()
     def normalize(self, archive: 'EntryArchive', logger: 'BoundLogger'):
         super().normalize(archive, logger)
         if self.reference and self.reference.density:
@@ -293,6 +433,7 @@ class IngredientPiece(IngredientAmount):
         description='The mass of the ingredient that should be used.',
     )
 
+    @traced()
     def normalize(self, archive: 'EntryArchive', logger: 'BoundLogger'):
         super().normalize(archive, logger)
         if self.reference and self.reference.weight_per_piece:
@@ -300,6 +441,24 @@ class IngredientPiece(IngredientAmount):
             self.calculate_nutrients(logger)
 
 
+class IngredientTotal(IngredientAmount):
+    """
+    A lightweight row summing up the amount of an ingredient over all steps of a
+    recipe. Used for the recipe aggregate with `compact_archives` instead of
+    copies of the step ingredients.
+    """
+
+    step_indices = Quantity(
+        type=int,
+        shape=['*'],
+        description='Indices of the recipe steps that use this ingredient.',
+    )
+
+    def normalize(self, archive: 'EntryArchive', logger: 'BoundLogger'):
+        # derived from the step ingredients by the recipe, nothing to resolve
+        pass
+
+
 class Tool(ArchiveSection):
     """
     A kitchen tool or utensil used in cooking.
@@ -484,6 +643,42 @@ class Recipe(BaseSection, Schema):
         ),
         unit='minute',
     )
+    number_of_ingredients = Quantity(
+        type=int,
+        description='Number of distinct ingredients.',
+    )
+    ingredient_lab_ids = Quantity(
+        type=str,
+        shape=['*'],
+        description='Distinct lab IDs of the ingredients, for flat search facets.',
+    )
+    tool_names = Quantity(
+        type=str,
+        shape=['*'],
+        description='Distinct names of the tools, for flat search facets.',
+    )
+    calorie_density = Quantity(
+        type=float,
+        unit='kcal/g',
+        description='Calories per gram of all ingredients.',
+    )
+    protein_ratio = Quantity(
+        type=float,
+        description='Share of the calories coming from protein (4 kcal per gram).',
+    )
+    minhash_signature = Quantity(
+        type=int,
+        shape=['*'],
+        description='MinHash signature of the set of ingredient lab IDs.',
+    )
+    similarity_keys = Quantity(
+        type=str,
+        shape=['*'],
+        description=(
+            'LSH band keys of the MinHash signature. Recipes sharing a key are '
+            'candidates for having similar ingredients.'
+        ),
+    )
     tools = SubSection(
         section_def=Tool,
         description='',
@@ -504,6 +699,19 @@ class Recipe(BaseSection, Schema):
         default=0.0,
     )
 
+    def content_hash(self) -> str:
+        """
+        Returns a hash over the parts of the recipe that its scaled versions are
+        derived from.
+        """
+        from nomad.utils import hash
+
+        recipe_dict = self.m_to_dict()
+        content = {
+            key: recipe_dict.get(key) for key in ('name', 'number_of_servings', 'steps')
+        }
+        return hash(json.dumps(content, sort_keys=True, default=str))
+
     def generate_description(self) -> None:
         """
         Generates an HTML formatted step-by-step instructions based on the recipe steps.
@@ -513,67 +721,190 @@ class Recipe(BaseSection, Schema):
             self.description += f'<li>{step.instruction}</li>'
         self.description += '</ol>'
 
-    def normalize(self, archive: 'EntryArchive', logger: 'BoundLogger') -> None:  # noqa: PLR0912
+    def resolve_ingredients(
+        self, archive: 'EntryArchive', logger: 'BoundLogger'
+    ) -> None:
         """
-        Collects all ingredients and tools from steps and adds them to the recipe's
-        ingredients and tools lists.
+        Searches the references of all step ingredients concurrently on a bounded
+        thread pool. Only the first call per normalization does the work. The log
+        output of each ingredient is replayed in step order once all are done.
+        Ingredients that already have a reference are resolved on the calling
+        thread, as are the found entries afterwards, since loading an archive
+        through its context is not thread-safe. The Ingredient entries that are not
+        found are created together.
         """
-        super().normalize(archive, logger)
+        if getattr(self, '_ingredients_resolved', False):
+            return
+        self._ingredients_resolved = True
 
-        all_ingredients = []
-        all_tools = []
+        ingredients = [
+            ingredient for step in self.steps for ingredient in step.ingredients
+        ]
+        if not ingredients:
+            return
 
-        for step in self.steps:
-            for ingredient in step.ingredients:
-                # Check if ingredient with the same name exists
-                existing = next(
-                    (ing for ing in all_ingredients if ing.name == ingredient.name),
-                    None,
-                )
+        def resolve(ingredient: IngredientAmount, buffered: BufferedLogger) -> None:
+            ingredient.resolve_reference(archive, buffered, create=False)
 
-                if existing is None:
-                    all_ingredients.append(ingredient)
-                else:
-                    # Sum quantities
-                    new_quantity = (existing.quantity or 0) + (ingredient.quantity or 0)
-
-                    # Sum nutrient values safely
-                    nutrients = {}
-                    for nutrient in ('calories', 'fat', 'protein', 'carbohydrates'):
-                        nutrients[nutrient] = (getattr(existing, nutrient, 0) or 0) + (
-                            getattr(ingredient, nutrient, 0) or 0
-                        )
-
-                    # Create a new ingredient with summed values
-                    ingredient_summed = IngredientAmount(
-                        name=existing.name,
-                        quantity=new_quantity,
-                        unit=existing.unit,
-                        mass=None,  # optionally recalc
-                        lab_id=existing.lab_id,
-                        reference=existing.reference,
-                        **nutrients,
+        def resolve_here(ingredient: IngredientAmount, buffered: BufferedLogger):
+            future = Future()
+            try:
+                resolve(ingredient, buffered)
+                future.set_result(None)
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        buffered_loggers = [BufferedLogger() for _ in ingredients]
+        searches = [ingredient.reference is None for ingredient in ingredients]
+        workers = max(1, min(configuration.normalization_workers, sum(searches)))
+        with (
+            span(
+                archive,
+                logger,
+                'resolve_ingredients',
+                self,
+                count=len(ingredients),
+                workers=workers,
+            ),
+            ThreadPoolExecutor(max_workers=workers) as executor,
+        ):
+            futures = [
+                executor.submit(resolve, ingredient, buffered) if search else None
+                for ingredient, buffered, search in zip(
+                    ingredients, buffered_loggers, searches
+                )
+            ]
+            # a given reference may be dereferenced for its lab_id
+            for index, future in enumerate(futures):
+                if future is None:
+                    futures[index] = resolve_here(
+                        ingredients[index], buffered_loggers[index]
                     )
 
-                    # Replace old ingredient with new summed one
-                    all_ingredients = [
-                        ing if ing.name != ingredient.name else ingredient_summed
-                        for ing in all_ingredients
-                    ]
+        missing: dict[str, list[IngredientAmount]] = {}
+        for ingredient, future, buffered in zip(ingredients, futures, buffered_loggers):
+            buffered.replay(logger)
+            try:
+                future.result()
+                if ingredient.reference:
+                    ingredient.reference.m_resolved()
+            except Exception as e:
+                logger.error(
+                    f'Failed to resolve ingredient {ingredient.name}',
+                    exc_info=e,
+                )
+            if not ingredient.reference and ingredient.lab_id:
+                missing.setdefault(ingredient.lab_id, []).append(ingredient)
 
+        if not missing:
+            return
+        logger.debug(
+            'Ingredient entries not found. Creating new ones.', count=len(missing)
+        )
+        try:
+            with span(archive, logger, 'create_entries', self, count=len(missing)):
+                references = create_archives(
+                    [group[0].new_ingredient_entry() for group in missing.values()],
+                    archive,
+                    overwrite=False,
+                    compact=configuration.compact_generated_entries,
+                )
+        except Exception as e:
+            logger.error('Failed to create Ingredient entries.', exc_info=True, error=e)
+            return
+        for group, reference in zip(missing.values(), references):
+            for ingredient in group:
+                ingredient.reference = reference
+
+    def collect_ingredients(self) -> list[IngredientAmount]:
+        """
+        Merges the ingredients of all steps by name, summing up their mass and
+        nutrients. With `compact_archives`, every ingredient becomes a lightweight
+        `IngredientTotal` row instead of a copy of the step ingredient.
+        """
+        occurrences: dict[str, list[tuple[int, IngredientAmount]]] = {}
+        for step_index, step in enumerate(self.steps):
+            for ingredient in step.ingredients:
+                occurrences.setdefault(ingredient.name, []).append(
+                    (step_index, ingredient)
+                )
+
+        collected = []
+        for indexed_ingredients in occurrences.values():
+            step_indices = [step_index for step_index, _ in indexed_ingredients]
+            ingredients = [ingredient for _, ingredient in indexed_ingredients]
+            first = ingredients[0]
+            if not configuration.compact_archives and len(ingredients) == 1:
+                collected.append(IngredientAmount.m_from_dict(first.m_to_dict()))
+                continue
+
+            total = (
+                IngredientTotal(step_indices=step_indices)
+                if configuration.compact_archives
+                else IngredientAmount()
+            )
+            total.name = first.name
+            total.lab_id = first.lab_id
+            total.reference = first.reference
+            total.diet_type = first.diet_type
+            total.mass = sum_quantity(ingredients, 'mass')
+            for nutrient in NUTRIENTS:
+                setattr(total, nutrient, sum_quantity(ingredients, nutrient))
+            collected.append(total)
+
+        return collected
+
+    def collect_tools(self) -> list[Tool]:
+        """
+        Collects the tools of all steps, unique by name. With `compact_archives`,
+        only the name and type of each tool are kept.
+        """
+        tools: dict[str, Tool] = {}
+        for step in self.steps:
             for tool in step.tools:
-                existing = next((tl for tl in all_tools if tl.name == tool.name), None)
-                if existing is None:
-                    all_tools.append(tool)
+                tools.setdefault(tool.name, tool)
+
+        if configuration.compact_archives:
+            return [Tool(name=tool.name, type=tool.type) for tool in tools.values()]
+        return [Tool.m_from_dict(tool.m_to_dict()) for tool in tools.values()]
+
+    def compute_search_fields(self) -> None:
+        """
+        Derives flat keyword lists and scalar metrics from the aggregated ingredients
+        and tools, so that search facets and histograms do not need the nested
+        subsections.
+        """
+        self.number_of_ingredients = len(self.ingredients)
+        self.ingredient_lab_ids = list(
+            dict.fromkeys(i.lab_id for i in self.ingredients if i.lab_id)
+        )
+        self.tool_names = list(dict.fromkeys(t.name for t in self.tools if t.name))
 
-        self.ingredients.extend(
-            IngredientAmount.m_from_dict(ingredient.m_to_dict())
-            for ingredient in all_ingredients
+        signature = minhash_signature(
+            self.ingredient_lab_ids, configuration.minhash_permutations
         )
-        self.tools.extend(Tool.m_from_dict(tool.m_to_dict()) for tool in all_tools)
+        if signature is not None:
+            self.minhash_signature = signature.tolist()
+            self.similarity_keys = lsh_band_keys(signature, configuration.minhash_bands)
+
+        mass = sum_quantity(self.ingredients, 'mass')
+        calories = self.calories.to('kcal').magnitude if self.calories else 0.0
+        if mass is not None and mass.to('g').magnitude > 0:
+            self.calorie_density = calories / mass.to('g').magnitude
+        if calories > 0 and self.protein is not None:
+            self.protein_ratio = 4 * self.protein.to('g').magnitude / calories
+
+    def aggregate(self, logger: 'BoundLogger') -> None:
+        """
+        Computes the recipe's ingredients, tools, totals and search fields from the
+        normalized steps.
+        """
+        self.ingredients.extend(self.collect_ingredients())
+        self.tools.extend(self.collect_tools())
 
         # --- Compute total nutrients ---
-        for nutrient in ('calories', 'fat', 'protein', 'carbohydrates'):
+        for nutrient in NUTRIENTS:
             setattr(
                 self,
                 nutrient,
@@ -585,7 +916,7 @@ class Recipe(BaseSection, Schema):
 
         # --- Compute nutrients per serving ---
         if self.number_of_servings:
-            for nutrient in ('calories', 'fat', 'protein', 'carbohydrates'):
+            for nutrient in NUTRIENTS:
                 per_serving_attr = f'{nutrient}_per_serving'
                 total_value = getattr(self, nutrient, 0.0)
                 setattr(self, per_serving_attr, total_value / self.number_of_servings)
@@ -596,30 +927,79 @@ class Recipe(BaseSection, Schema):
         except Exception as e:
             logger.warning('recipe_duration_sum_failed', error=str(e))
 
-        ingredient_diets = [
-            (ingredient.diet_type or 'ambiguous')
-            for ingredient in (self.ingredients or [])
-        ]
-
         # --- Find the diet type ---
-        if not ingredient_diets:
-            self.diet_type = 'ambiguous'
-        elif 'omnivorous' in ingredient_diets:
-            self.diet_type = 'omnivorous'
-        elif all(d == 'vegan' for d in ingredient_diets):
-            self.diet_type = 'vegan'
-        elif 'vegetarian' in ingredient_diets:
-            self.diet_type = 'vegetarian'
-        else:
-            self.diet_type = 'ambiguous'
+        self.diet_type = combine_diet_types(
+            [ingredient.diet_type for ingredient in (self.ingredients or [])]
+        )
+
+        self.compute_search_fields()
+
+    @traced(
+        lambda recipe: {
+            'steps': len(recipe.steps),
+            'ingredients': len(recipe.ingredients),
+            'tools': len(recipe.tools),
+        }
+    )
+    def normalize(self, archive: 'EntryArchive', logger: 'BoundLogger') -> None:
+        """
+        Collects all ingredients and tools from steps and adds them to the recipe's
+        ingredients and tools lists.
+        """
+        super().normalize(archive, logger)
+        self._ingredients_resolved = False
+
+        with span(archive, logger, 'aggregate', self):
+            self.aggregate(logger)
 
         self.generate_description()
 
 
+class ScaledRecipeVariant(ArchiveSection):
+    """
+    The scaled totals of a recipe for one of several target servings.
+    """
+
+    servings = Quantity(
+        type=int,
+        description='Number of servings of the scaled recipe',
+    )
+    scaling_factor = Quantity(
+        type=float,
+        description='The factor the original recipe is scaled by.',
+    )
+    calories = Quantity(
+        type=float,
+        unit='kcal',
+        description='Total calories of the scaled recipe.',
+    )
+    fat = Quantity(
+        type=float,
+        unit='g',
+        description='Total fat of the scaled recipe.',
+    )
+    protein = Quantity(
+        type=float,
+        unit='g',
+        description='Total proteins of the scaled recipe.',
+    )
+    carbohydrates = Quantity(
+        type=float,
+        unit='g',
+        description='Total carbohydrates of the scaled recipe.',
+    )
+    scaled_recipe = Quantity(
+        type=Recipe,
+        description='The resulting scaled recipe, if materialized',
+    )
+
+
 class RecipeScaler(BaseSection, Schema):
     """
-    A schema that references an existing recipe and creates a scaled version
-    based on desired number of servings.
+    A schema that references an existing recipe and computes the scaled totals
+    for a desired number of servings, and optionally for a list of further target
+    servings. Scaled versions of the recipe are only created as new entries if
+    `materialize` is set.
     """
 
     m_def = Section(
@@ -636,10 +1016,143 @@ class RecipeScaler(BaseSection, Schema):
         description='Number of servings desired for the scaled recipe',
         a_eln=ELNAnnotation(component=ELNComponentEnum.NumberEditQuantity),
     )
+    target_servings = Quantity(
+        type=int,
+        shape=['*'],
+        description='Further numbers of servings to scale the recipe for',
+        a_eln=ELNAnnotation(component=ELNComponentEnum.NumberEditQuantity),
+    )
+    materialize = Quantity(
+        type=bool,
+        default=False,
+        description='Create new recipe entries for the scaled recipes.',
+        a_eln=ELNAnnotation(component=ELNComponentEnum.BoolEditQuantity),
+    )
+    scaling_factor = Quantity(
+        type=float,
+        description='The factor the original recipe is scaled by.',
+    )
+    calories = Quantity(
+        type=float,
+        unit='kcal',
+        description='Total calories of the scaled recipe.',
+        a_eln=ELNAnnotation(defaultDisplayUnit='kcal'),
+    )
+    fat = Quantity(
+        type=float,
+        unit='g',
+        description='Total fat of the scaled recipe.',
+    )
+    protein = Quantity(
+        type=float,
+        unit='g',
+        description='Total proteins of the scaled recipe.',
+    )
+    carbohydrates = Quantity(
+        type=float,
+        unit='g',
+        description='Total carbohydrates of the scaled recipe.',
+    )
+    original_recipe_hash = Quantity(
+        type=str,
+        description='Content hash of the original recipe the scaled recipes are for.',
+    )
     scaled_recipe = Quantity(
         type=Recipe,
-        description='The resulting scaled recipe',
+        description='The resulting scaled recipe, if materialized',
     )
+    variants = SubSection(
+        section_def=ScaledRecipeVariant,
+        description='The scaled recipes for the target servings.',
+        repeats=True,
+    )
+
+    def scale_totals(self, recipe: Recipe, scaling_factors: list[float]) -> list[dict]:
+        """
+        Computes the scaled nutrient totals of the original recipe for all scaling
+        factors at once.
+        """
+        factors = np.asarray(scaling_factors, dtype=float)
+        totals = [dict(scaling_factor=factor) for factor in factors]
+        for nutrient in NUTRIENTS:
+            value = getattr(recipe, nutrient)
+            if value is None:
+                continue
+            for total, scaled_value in zip(totals, value * factors):
+                total[nutrient] = scaled_value
+        return totals
+
+    def scale_recipes(
+        self,
+        recipe: Recipe,
+        scaling_factors: list[float],
+        archive: 'EntryArchive',
+        logger: 'BoundLogger',
+    ) -> list[str | None]:
+        """
+        Scales the given recipe by all specified scaling factors and creates new
+        archived entries for the scaled recipes. The entries are named after the
+        content hash of the recipe and the exact factor, scaled recipes that already
+        exist in the upload are reused. The recipe is serialized once and every
+        ingredient quantity is scaled for all missing factors in a single pass. The
+        entries are written once all scaled recipes are built.
+        """
+        content_hash = recipe.content_hash()
+        self.original_recipe_hash = content_hash
+        references: list[str | None] = [None] * len(scaling_factors)
+        file_names = {}
+        with span(archive, logger, 'find_entries', self, count=len(scaling_factors)):
+            for index, factor in enumerate(scaling_factors):
+                if factor == 1.0:
+                    logger.warning('Scaling factor is 1.0, no scaling applied.')
+                    continue
+                file_name = (
+                    f'{recipe.name.replace(" ", "_").lower()}'
+                    f'_scaled_x{float(factor)!r}_{content_hash[:12]}.archive.json'
+                )
+                references[index] = find_archive(archive, file_name)
+                if references[index] is None:
+                    file_names[index] = file_name
+        if not file_names:
+            return references
+
+        factors = np.asarray([scaling_factors[i] for i in file_names], dtype=float)
+        recipe_dict = recipe.m_to_dict(with_root_def=True)
+        scaled_recipes = []
+        for factor in factors:
+            scaled_recipe = Recipe.m_from_dict(recipe_dict)
+            scaled_recipe.name += f' (scaled x{factor:.2f})'
+            scaled_recipe.number_of_servings = round(recipe.number_of_servings * factor)
+            # reset ingredients and tools, that will be populated from steps
+            scaled_recipe.tools = []
+            scaled_recipe.ingredients = []
+            scaled_recipes.append(scaled_recipe)
+
+        # Scale ingredients in steps
+        for step_index, step in enumerate(recipe.steps):
+            for ingredient_index, ingredient in enumerate(step.ingredients):
+                for quantity in ('mass', 'volume', 'pieces', *NUTRIENTS):
+                    value = getattr(ingredient, quantity, None)
+                    if value is None:
+                        continue
+                    for scaled_recipe, scaled_value in zip(
+                        scaled_recipes, value * factors
+                    ):
+                        scaled_ingredient = scaled_recipe.steps[step_index].ingredients[
+                            ingredient_index
+                        ]
+                        setattr(scaled_ingredient, quantity, scaled_value)
+
+        with span(archive, logger, 'create_entries', self, count=len(file_names)):
+            created = create_archives(
+                list(zip(scaled_recipes, file_names.values())),
+                archive,
+                overwrite=False,
+                compact=configuration.compact_generated_entries,
+            )
+        for index, reference in zip(file_names, created):
+            references[index] = reference
+        return references
 
     def scale_recipe(
         self,
@@ -652,49 +1165,505 @@ class RecipeScaler(BaseSection, Schema):
         Scales the given recipe by the specified scaling factor and creates
         a new archived entry for the scaled recipe.
         """
-        if scaling_factor == 1.0:
-            logger.warning('Scaling factor is 1.0, no scaling applied.')
+        self.scaled_recipe = self.scale_recipes(
+            recipe, [scaling_factor], archive, logger
+        )[0]
+
+    @traced(lambda scaler: {'variants': len(scaler.variants)})
+    def normalize(self, archive: 'EntryArchive', logger: 'BoundLogger') -> None:
+        """
+        Uses the referenced original recipe entry and specified desired and target
+        servings to compute the scaled totals and, if requested, to create scaled
+        recipe entries.
+        """
+        super().normalize(archive, logger)
+
+        self.scaled_recipe = None
+        self.variants = []
+        target_servings = list(self.target_servings or [])
+        servings = [self.desired_servings] if self.desired_servings else []
+        servings.extend(target_servings)
+        if not self.original_recipe or not servings:
+            return
+
+        try:
+            original_servings = self.original_recipe.number_of_servings
+            scaling_factors = [serving / original_servings for serving in servings]
+            totals = self.scale_totals(self.original_recipe, scaling_factors)
+            references = [None] * len(scaling_factors)
+            if self.materialize:
+                references = self.scale_recipes(
+                    self.original_recipe, scaling_factors, archive, logger
+                )
+        except Exception as e:
+            logger.error('Error while scaling recipe.', exc_info=True, error=e)
             return
-        scaled_recipe = Recipe().m_from_dict(recipe.m_to_dict(with_root_def=True))
-        scaled_recipe.name += f' (scaled x{scaling_factor:.2f})'
-        scaled_recipe.number_of_servings *= scaling_factor
 
-        # reset ingredients and tools, that will be populated from steps
-        scaled_recipe.tools = []
-        scaled_recipe.ingredients = []
+        if self.desired_servings:
+            for name, value in totals.pop(0).items():
+                setattr(self, name, value)
+            self.scaled_recipe = references.pop(0)
+        self.variants = [
+            ScaledRecipeVariant(servings=serving, scaled_recipe=reference, **total)
+            for serving, total, reference in zip(target_servings, totals, references)
+        ]
 
-        # Scale ingredients in steps
-        for step in scaled_recipe.steps:
-            for ingredient in step.ingredients:
-                ingredient.quantity *= scaling_factor
-                if ingredient.quantity_si:
-                    ingredient.quantity_si *= scaling_factor
-
-        file_name = (
-            (f'{recipe.name} scaled x{scaling_factor:.2f}.archive.json')
-            .replace(' ', '_')
-            .lower()
+
+class PlannedMeal(ArchiveSection):
+    """
+    A recipe planned for one day of a meal plan. The per-serving values of the
+    recipe are cached together with the hash of the recipe entry they were taken
+    from.
+    """
+
+    name = Quantity(
+        type=str, a_eln=ELNAnnotation(component=ELNComponentEnum.StringEditQuantity)
+    )
+    day = Quantity(
+        type=int,
+        default=1,
+        description='The day of the meal plan, starting at 1.',
+        a_eln=ELNAnnotation(component=ELNComponentEnum.NumberEditQuantity),
+    )
+    recipe = Quantity(
+        type=Recipe,
+        description='Reference to the planned recipe.',
+        a_eln=ELNAnnotation(component=ELNComponentEnum.ReferenceEditQuantity),
+    )
+    servings = Quantity(
+        type=float,
+        default=1.0,
+        description='The number of servings of the recipe.',
+        a_eln=ELNAnnotation(component=ELNComponentEnum.NumberEditQuantity),
+    )
+    recipe_entry_hash = Quantity(
+        type=str,
+        description='Hash of the recipe entry the cached values were taken from.',
+    )
+    diet_type = Quantity(
+        type=MEnum(
+            'omnivorous',
+            'vegetarian',
+            'vegan',
+            'ambiguous',
+        ),
+    )
+    duration = Quantity(
+        type=float,
+        unit='minute',
+        description='Duration of the recipe.',
+    )
+    calories_per_serving = Quantity(
+        type=float,
+        unit='kcal',
+        description='Calories per serving of the recipe.',
+    )
+    fat_per_serving = Quantity(
+        type=float,
+        unit='g',
+        description='Fats per serving of the recipe.',
+    )
+    protein_per_serving = Quantity(
+        type=float,
+        unit='g',
+        description='Proteins per serving of the recipe.',
+    )
+    carbohydrates_per_serving = Quantity(
+        type=float,
+        unit='g',
+        description='Carbohydrates per serving of the recipe.',
+    )
+
+    @property
+    def recipe_entry_id(self) -> str | None:
+        recipe = self.m_get(PlannedMeal.recipe)
+        if isinstance(recipe, MProxy):
+            return get_entry_id_from_reference(recipe.m_proxy_value)
+        return None
+
+    def is_cached(self, entry_hash: str | None) -> bool:
+        return (
+            entry_hash is not None
+            and self.recipe_entry_hash == entry_hash
+            and self.calories_per_serving is not None
         )
-        self.scaled_recipe = create_archive(
-            scaled_recipe, archive=archive, file_name=file_name, overwrite=True
+
+    def update_cache(self, entry_hash: str | None) -> None:
+        """
+        Copies the per-serving values from the referenced recipe. Recipes without
+        a number of servings count as a single serving.
+        """
+        recipe = self.recipe
+        if not self.name:
+            self.name = recipe.name
+        self.diet_type = recipe.diet_type
+        self.duration = recipe.duration
+        for nutrient in NUTRIENTS:
+            value = getattr(recipe, f'{nutrient}_per_serving')
+            if value is None:
+                value = getattr(recipe, nutrient)
+            setattr(self, f'{nutrient}_per_serving', value)
+        self.recipe_entry_hash = entry_hash
+
+    def get_nutrient(self, nutrient: str):
+        value = getattr(self, f'{nutrient}_per_serving')
+        if value is None:
+            return None
+        return value * (self.servings or 0.0)
+
+
+class DailyNutrition(ArchiveSection):
+    """
+    The nutrients of all meals planned for one day.
+    """
+
+    day = Quantity(type=int)
+    calories = Quantity(type=float, unit='kcal')
+    fat = Quantity(type=float, unit='g')
+    protein = Quantity(type=float, unit='g')
+    carbohydrates = Quantity(type=float, unit='g')
+
+
+class MealPlan(BaseSection, Schema):
+    """
+    A schema for planning meals over several days, referencing recipes with the
+    number of servings and computing the total and daily nutrients.
+    """
+
+    m_def = Section(
+        label='Meal Plan',
+        categories=[UseCaseElnCategory],
+    )
+    number_of_days = Quantity(
+        type=int,
+        description='The number of days covered by the meal plan.',
+    )
+    diet_type = Quantity(
+        type=MEnum(
+            'omnivorous',
+            'vegetarian',
+            'vegan',
+            'ambiguous',
+        ),
+    )
+    duration = Quantity(
+        type=float,
+        unit='minute',
+        description='Total duration of all planned recipes.',
+        a_eln=ELNAnnotation(defaultDisplayUnit='minute'),
+    )
+    calories = Quantity(
+        type=float,
+        unit='kcal',
+        description='Total calories of the meal plan.',
+        a_eln=ELNAnnotation(defaultDisplayUnit='kcal'),
+    )
+    fat = Quantity(
+        type=float,
+        unit='g',
+        description='Total fat of the meal plan.',
+    )
+    protein = Quantity(
+        type=float,
+        unit='g',
+        description='Total proteins of the meal plan.',
+    )
+    carbohydrates = Quantity(
+        type=float,
+        unit='g',
+        description='Total carbohydrates of the meal plan.',
+    )
+    meals = SubSection(
+        section_def=PlannedMeal,
+        description='',
+        repeats=True,
+    )
+    days = SubSection(
+        section_def=DailyNutrition,
+        description='',
+        repeats=True,
+    )
+
+    def update_meals(self, logger: 'BoundLogger') -> None:
+        """
+        Refreshes the cached recipe values of all meals. The entry hashes of all
+        referenced recipes are looked up at once and only recipes whose hash
+        changed since the last normalization are loaded.
+        """
+        entry_ids = {meal.recipe_entry_id for meal in self.meals} - {None}
+        entry_hashes = {}
+        if entry_ids:
+            try:
+                entry_hashes = get_entry_hashes(entry_ids)
+            except Exception as e:
+                logger.warning('Could not look up recipe entry hashes.', error=str(e))
+
+        reloaded = 0
+        for meal in self.meals:
+            if meal.recipe is None:
+                continue
+            entry_hash = entry_hashes.get(meal.recipe_entry_id)
+            if meal.is_cached(entry_hash):
+                continue
+            try:
+                meal.update_cache(entry_hash)
+                reloaded += 1
+            except Exception as e:
+                logger.error(f'Failed to load recipe for meal {meal.name}', exc_info=e)
+        logger.debug(
+            'Updated meal plan recipes.',
+            reloaded=reloaded,
+            cached=len(self.meals) - reloaded,
         )
 
     def normalize(self, archive: 'EntryArchive', logger: 'BoundLogger') -> None:
         """
-        Uses the referenced original recipe entry and specified desired servings to
-        create a scaled recipe entry.
+        Sums up the nutrients of the planned meals per day and in total.
         """
         super().normalize(archive, logger)
+        self.update_meals(logger)
+        self.compute_totals([meal for meal in self.meals if meal.recipe is not None])
 
-        self.scaled_recipe = None
-        if self.original_recipe and self.desired_servings:
+    def compute_totals(self, meals: list[PlannedMeal]) -> None:
+        """
+        Sums up the cached nutrients of the given meals per day and in total.
+        """
+        days: dict[int, list[PlannedMeal]] = {}
+        for meal in sorted(meals, key=lambda meal: meal.day or 1):
+            days.setdefault(meal.day or 1, []).append(meal)
+
+        self.days = []
+        for day, day_meals in days.items():
+            daily = DailyNutrition(day=day)
+            for nutrient in NUTRIENTS:
+                values = [meal.get_nutrient(nutrient) for meal in day_meals]
+                setattr(daily, nutrient, sum(v for v in values if v is not None))
+            self.days.append(daily)
+
+        for nutrient in NUTRIENTS:
+            setattr(self, nutrient, sum_quantity(self.days, nutrient))
+        self.number_of_days = max(days, default=0)
+        self.duration = sum_quantity(meals, 'duration')
+        self.diet_type = combine_diet_types([meal.diet_type for meal in meals])
+
+
+def scaler_factors(scaler: dict, original_servings: int | None) -> list[float]:
+    """
+    Returns the factors a recipe scaler given as data scales its original recipe
+    by: the factor of the desired servings, or else the factors of the target
+    servings. Scalers that are not normalized yet are scaled by their servings.
+    """
+    if scaler.get('scaling_factor') is not None:
+        return [scaler['scaling_factor']]
+    factors = [
+        variant['scaling_factor']
+        for variant in scaler.get('variants', [])
+        if variant.get('scaling_factor') is not None
+    ]
+    if factors or not original_servings:
+        return factors
+    desired_servings = scaler.get('desired_servings')
+    servings = [desired_servings] if desired_servings else scaler.get('target_servings')
+    return [serving / original_servings for serving in servings or []]
+
+
+class ShoppingListItem(ArchiveSection):
+    """
+    The total amount of one ingredient over all recipes of a shopping list.
+    """
+
+    name = Quantity(
+        type=str, a_eln=ELNAnnotation(component=ELNComponentEnum.StringEditQuantity)
+    )
+    lab_id = Quantity(
+        type=str,
+        description='The ID of the ingredient type the amounts are merged by.',
+    )
+    mass = Quantity(
+        type=float,
+        unit='gram',
+        description="""The total mass of the ingredient, including the mass derived
+            from volumes and pieces where known.""",
+    )
+    volume = Quantity(
+        type=float,
+        unit='milliliter',
+        description='The total volume of the ingredient given as volumes.',
+    )
+    pieces = Quantity(
+        type=float,
+        description='The total number of pieces of the ingredient given as pieces.',
+    )
+    number_of_recipes = Quantity(
+        type=int,
+        description='The number of recipes using the ingredient.',
+    )
+
+
+class ShoppingList(BaseSection, Schema):
+    """
+    A schema that merges the ingredients of many recipes, e.g. scaled recipes for
+    catering, into the total amounts that need to be bought.
+    """
+
+    m_def = Section(
+        label='Shopping List',
+        categories=[UseCaseElnCategory],
+    )
+    recipes = Quantity(
+        type=Recipe,
+        shape=['*'],
+        description='References to the recipes to shop for.',
+        a_eln=ELNAnnotation(component=ELNComponentEnum.ReferenceEditQuantity),
+    )
+    recipe_scalers = Quantity(
+        type=RecipeScaler,
+        shape=['*'],
+        description="""References to recipe scalers. Their original recipes are shopped
+            for with the amounts scaled by the scaling factor.""",
+        a_eln=ELNAnnotation(component=ELNComponentEnum.ReferenceEditQuantity),
+    )
+    items = SubSection(
+        section_def=ShoppingListItem,
+        description='',
+        repeats=True,
+    )
+
+    @staticmethod
+    def iter_referenced_data(
+        references: list[tuple[object, str | None]], logger: 'BoundLogger'
+    ) -> Iterator[tuple[int, dict, str | None]]:
+        """
+        Yields the index of every reference together with the data of the
+        referenced entry and the upload it was read from. References are given as
+        sections, proxies or reference strings, each with the upload that relative
+        references point into. They are read in one batch per upload from the
+        processed archives. Sections and proxies that cannot be read this way are
+        dereferenced individually, without an upload.
+        """
+        batches: dict[str, list[tuple[int, str]]] = {}
+        unbatched = []
+        for index, (reference, default_upload_id) in enumerate(references):
+            value = (
+                reference.m_proxy_value if isinstance(reference, MProxy) else reference
+            )
+            upload_id, entry_id = None, None
+            if isinstance(value, str):
+                upload_id, entry_id = parse_reference(value)
+                upload_id = upload_id or default_upload_id
+            if upload_id and entry_id:
+                batches.setdefault(upload_id, []).append((index, entry_id))
+            else:
+                unbatched.append(index)
+
+        for upload_id, batch in batches.items():
+            read = 0
             try:
-                scaling_factor = (
-                    self.desired_servings / self.original_recipe.number_of_servings
-                )
-                self.scale_recipe(self.original_recipe, scaling_factor, archive, logger)
+                for data in read_archive_data(
+                    upload_id, [entry_id for _, entry_id in batch]
+                ):
+                    index = batch[read][0]
+                    read += 1
+                    yield index, data, upload_id
             except Exception as e:
-                logger.error('Error while scaling recipe.', exc_info=True, error=e)
+                logger.warning(
+                    'Could not read archives in batch.',
+                    upload_id=upload_id,
+                    error=str(e),
+                )
+                unbatched.extend(index for index, _ in batch[read:])
+
+        for index in unbatched:
+            reference = references[index][0]
+            if isinstance(reference, str):
+                logger.warning('Could not read archive.', reference=reference)
+                continue
+            yield index, reference.m_to_dict(), None
+
+    def iter_recipe_data(
+        self, archive: 'EntryArchive', logger: 'BoundLogger'
+    ) -> Iterator[dict]:
+        """
+        Yields the data of the referenced recipes one at a time. Recipes are read in
+        one batch per upload from the processed archives. Recipes that cannot be
+        read this way are dereferenced individually.
+        """
+        references = [
+            (recipe, archive.metadata.upload_id)
+            for recipe in self.m_get(ShoppingList.recipes) or []
+        ]
+        for _, data, _ in self.iter_referenced_data(references, logger):
+            yield data
+
+    def iter_scaled_recipe_data(
+        self, archive: 'EntryArchive', logger: 'BoundLogger'
+    ) -> Iterator[tuple[dict, float]]:
+        """
+        Yields the data of the original recipe of every referenced recipe scaler
+        once for every factor it is scaled by, see `scaler_factors`. The scalers
+        and then their original recipes are read in one batch per upload.
+        """
+        scalers = self.m_get(ShoppingList.recipe_scalers) or []
+        originals, scaler_data = [], []
+        for index, data, upload_id in self.iter_referenced_data(
+            [(scaler, archive.metadata.upload_id) for scaler in scalers], logger
+        ):
+            if upload_id is None:
+                # a section, its reference may be a proxy or the recipe itself
+                scaler = scalers[index]
+                if isinstance(scaler, MProxy):
+                    scaler = scaler.m_proxy_resolve()
+                original = scaler.m_get(RecipeScaler.original_recipe)
+            else:
+                original = data.get('original_recipe')
+            if original is None:
+                logger.warning('Recipe scaler has no original recipe.', scaler=index)
+                continue
+            originals.append((original, upload_id or archive.metadata.upload_id))
+            scaler_data.append(data)
+
+        for index, recipe_data, _ in self.iter_referenced_data(originals, logger):
+            factors = scaler_factors(
+                scaler_data[index], recipe_data.get('number_of_servings')
+            )
+            if not factors:
+                logger.warning('Recipe scaler has no servings to shop for.')
+            for factor in factors:
+                yield recipe_data, factor
+
+    def normalize(self, archive: 'EntryArchive', logger: 'BoundLogger') -> None:
+        """
+        Merges the step ingredients of all recipes and scaled recipes by their
+        ingredient ID into the total mass, volume and pieces.
+        """
+        super().normalize(archive, logger)
+
+        totals: dict[str, dict] = {}
+        recipes = itertools.chain(
+            ((data, 1.0) for data in self.iter_recipe_data(archive, logger)),
+            self.iter_scaled_recipe_data(archive, logger),
+        )
+        for recipe_data, factor in recipes:
+            used = set()
+            for step in recipe_data.get('steps', []):
+                for ingredient in step.get('ingredients', []):
+                    name = ingredient.get('name')
+                    lab_id = ingredient.get('lab_id') or (name and format_lab_id(name))
+                    if not lab_id:
+                        continue
+                    total = totals.setdefault(
+                        lab_id, dict(name=name, lab_id=lab_id, number_of_recipes=0)
+                    )
+                    for quantity in ('mass', 'volume', 'pieces'):
+                        if ingredient.get(quantity) is not None:
+                            total[quantity] = total.get(quantity, 0.0) + factor * (
+                                float(ingredient[quantity])
+                            )
+                    if lab_id not in used:
+                        used.add(lab_id)
+                        total['number_of_recipes'] += 1
+
+        self.items = [ShoppingListItem(**total) for total in totals.values()]
 
 
 m_package.__init_metainfo__()
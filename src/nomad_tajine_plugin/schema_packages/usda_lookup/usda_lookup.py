@@ -1,12 +1,12 @@
 import json
 
-import requests
-
 protein_id = 1003  # USDA Nutrient ID for Protein
 fat_id = 1004  # USDA Nutrient ID for Total lipid (fat)
 carb_id = 1005  # USDA Nutrient ID for Carbohydrate, by difference
 calorie_id = 1008  # USDA Nutrient ID for Energy (kcal)
 
+USDA_API_URL = 'https://api.nal.usda.gov/fdc/v1'
+
 FOOD_CATEGORY_CLASSIFICATION = {
     # --------------------------------------------------------------------
     # omnivorous: Categories that are inherently meat, poultry, or fish.
@@ -57,13 +57,18 @@ FOOD_CATEGORY_CLASSIFICATION = {
 def get_usda_data(
     ingredient_name,
     usda_api_key,
+    api_url=USDA_API_URL,
+    timeout=30.0,
 ):
     """
-    Finds a food by its name and returns its calorie count.
+    Finds a food by its name and returns its calorie count. Requests to the
+    FoodData Central API at `api_url` fail after `timeout` seconds.
     """
+    import requests
+
     print(f'Searching for ingredient: {ingredient_name}...')
 
-    search_url = 'https://api.nal.usda.gov/fdc/v1/foods/search'
+    search_url = f'{api_url}/foods/search'
     search_params = {
         'query': ingredient_name,
         'dataType': ['SR Legacy'],
@@ -73,7 +78,7 @@ def get_usda_data(
 
     result = {}
     try:
-        response = requests.get(search_url, params=search_params)
+        response = requests.get(search_url, params=search_params, timeout=timeout)
         response.raise_for_status()  # Raise an exception for bad status codes
         search_data = response.json()
 
@@ -0,0 +1,99 @@
+"""
+MinHash signatures and locality-sensitive hashing (LSH) band keys for finding
+recipes with similar ingredient sets.
+
+Two sets with Jaccard similarity `s` agree on each signature value with probability
+`s`. The signature is split into bands and every band is hashed into a keyword, so
+that recipes sharing at least one band key are candidates for being similar. The
+candidates can then be re-ranked by their exact Jaccard similarity.
+"""
+
+import hashlib
+from collections.abc import Iterable
+from functools import lru_cache
+
+import numpy as np
+
+MERSENNE_PRIME = (1 << 31) - 1
+SEED = 42
+
+
+@lru_cache
+def _permutations(num_perm: int) -> tuple[np.ndarray, np.ndarray]:
+    # fixed seed, signatures are only comparable with the same hash functions
+    rng = np.random.default_rng(SEED)
+    a = rng.integers(1, MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+    b = rng.integers(0, MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+    return a, b
+
+
+def token_hash(token: str) -> int:
+    digest = hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % MERSENNE_PRIME
+
+
+def minhash_signature(tokens: Iterable[str], num_perm: int = 64) -> np.ndarray | None:
+    """
+    Returns the MinHash signature of a set of tokens using `num_perm` hash functions
+    of the form `(a * x + b) mod p`, or None for an empty set.
+    """
+    hashes = np.fromiter({token_hash(token) for token in tokens}, dtype=np.int64)
+    if hashes.size == 0:
+        return None
+    a, b = _permutations(num_perm)
+    # all values are below 2**31, so the products fit into 64 bit integers
+    return ((np.outer(a, hashes) + b[:, None]) % MERSENNE_PRIME).min(axis=1)
+
+
+def lsh_band_keys(signature: np.ndarray, bands: int = 16) -> list[str]:
+    """
+    Splits the signature into `bands` bands and returns one keyword per band,
+    prefixed with the band index. The number of bands must divide the length of
+    the signature.
+    """
+    if not 0 < bands <= len(signature) or len(signature) % bands:
+        raise ValueError(
+            f'Cannot split a signature of length {len(signature)} into {bands} bands'
+        )
+    rows = len(signature) // bands
+    keys = []
+    for band in range(bands):
+        values = signature[band * rows : (band + 1) * rows].astype('>i8').tobytes()
+        digest = hashlib.blake2b(values, digest_size=8).hexdigest()
+        keys.append(f'{band:02d}_{digest}')
+    return keys
+
+
+def estimate_similarity(signature: np.ndarray, other: np.ndarray) -> float:
+    """
+    Estimates the Jaccard similarity of two sets from their signatures.
+    """
+    return float(np.mean(np.asarray(signature) == np.asarray(other)))
+
+
+def jaccard_similarity(tokens: Iterable[str], other: Iterable[str]) -> float:
+    tokens, other = set(tokens), set(other)
+    if not tokens and not other:
+        return 0.0
+    return len(tokens & other) / len(tokens | other)
+
+
+def rerank_by_jaccard(
+    tokens: Iterable[str],
+    candidates: Iterable[tuple[str, Iterable[str]]],
+    top_k: int | None = None,
+    min_similarity: float = 0.0,
+) -> list[tuple[str, float]]:
+    """
+    Re-ranks candidate recipes, given as pairs of an ID and their ingredient lab
+    IDs, by their exact Jaccard similarity to the given ingredient lab IDs. Returns
+    the IDs with their similarity, most similar first.
+    """
+    tokens = set(tokens)
+    ranked = [
+        (candidate_id, jaccard_similarity(tokens, candidate_tokens))
+        for candidate_id, candidate_tokens in candidates
+    ]
+    ranked = [item for item in ranked if item[1] >= min_similarity]
+    ranked.sort(key=lambda item: item[1], reverse=True)
+    return ranked[:top_k] if top_k is not None else ranked
@@ -15,25 +15,213 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 from typing import TYPE_CHECKING
+from weakref import WeakKeyDictionary
 
 if TYPE_CHECKING:
+    from nomad.datamodel.context import (
+        Context,
+    )
     from nomad.datamodel.data import (
         ArchiveSection,
     )
     from nomad.datamodel.datamodel import (
         EntryArchive,
     )
+    from structlog.stdlib import (
+        BoundLogger,
+    )
 
 
 def get_reference(upload_id: str, entry_id: str) -> str:
     return f'../uploads/{upload_id}/archive/{entry_id}#data'
 
 
+def parse_reference(reference: str) -> tuple[str | None, str | None]:
+    """
+    Returns the upload and entry id of an archive reference. The upload id is `None`
+    for references within the same upload.
+    """
+    match = re.search(
+        r'/uploads?/(?:(?!archive/)([^/#]+)/)?archive/(?!mainfile/)([^/#]+)',
+        reference,
+    )
+    if not match:
+        return None, None
+    return match.group(1), match.group(2)
+
+
+def get_entry_id_from_reference(reference: str) -> str | None:
+    return parse_reference(reference)[1]
+
+
+def get_entry_hashes(entry_ids: list[str]) -> dict[str, str]:
+    """
+    Looks up the hashes of the raw files of the given entries with a single query.
+    """
+    from nomad.processing import Entry
+
+    entries = Entry.objects(entry_id__in=list(entry_ids)).only('entry_id', 'entry_hash')
+    return {entry.entry_id: entry.entry_hash for entry in entries}
+
+
+def read_archive_data(upload_id: str, entry_ids: list[str]) -> Iterator[dict]:
+    """
+    Reads the `data` sections of the given entries of an upload as plain dicts,
+    without building metainfo sections or resolving references. The upload files
+    are opened once and the entries are yielded one at a time.
+    """
+    from nomad.archive import to_json
+    from nomad.files import UploadFiles
+
+    upload_files = UploadFiles.get(upload_id)
+    if upload_files is None:
+        raise KeyError(upload_id)
+    try:
+        for entry_id in entry_ids:
+            with upload_files.read_archive(entry_id) as reader:
+                yield to_json(reader[entry_id]['data'])
+    finally:
+        upload_files.close()
+
+
+class UploadIndex:
+    """
+    The raw files of an upload and the entry ids computed for them. The index is
+    built once per processing run, listing every directory once when it is first
+    needed, and is updated as entries are created. Existence checks and references
+    then need neither a file system stat nor a hash. If a directory cannot be
+    listed, existence checks fall back to the context once per file.
+
+    The index assumes that only this run adds raw files to the upload while it is
+    cached for the context. As entries of an upload may be processed in parallel,
+    a file that is missing from the index is checked again with the context just
+    before it is written.
+    """
+
+    def __init__(self, upload_id: str):
+        self.upload_id = upload_id
+        self.raw_files: dict[str, bool] = {}
+        self.directories: dict[str, bool] = {}
+        self.entry_ids: dict[str, str] = {}
+
+    def exists(self, file_name: str, context: 'Context', recheck: bool = False) -> bool:
+        """
+        Returns if the raw file exists. With `recheck`, a file that is not known to
+        exist is looked up with the context again.
+        """
+        directory = os.path.dirname(file_name)
+        if directory not in self.directories:
+            raw_files = list_raw_files(context, directory)
+            self.directories[directory] = raw_files is not None
+            self.raw_files.update(dict.fromkeys(raw_files or (), True))
+        known = self.raw_files.get(file_name)
+        if known or (known is not None and not recheck):
+            return known
+        if self.directories[directory] and not recheck:
+            return False
+        self.raw_files[file_name] = context.raw_path_exists(file_name)
+        return self.raw_files[file_name]
+
+    def add(self, file_name: str) -> None:
+        self.raw_files[file_name] = True
+
+    def entry_id(self, file_name: str) -> str:
+        if file_name not in self.entry_ids:
+            from nomad.utils import hash
+
+            self.entry_ids[file_name] = hash(self.upload_id, file_name)
+        return self.entry_ids[file_name]
+
+
+_upload_indices: 'WeakKeyDictionary[Context, UploadIndex]' = WeakKeyDictionary()
+
+
+def list_raw_files(context: 'Context', directory: str) -> set[str] | None:
+    """
+    Lists the raw files in a directory of the upload of the context with a single
+    directory scan, if the raw files are available locally. Returns None if they
+    cannot be listed.
+    """
+    try:
+        if getattr(context, 'upload_files', None) is not None:
+            raw_path = context.raw_path()
+        else:
+            raw_path = getattr(context, 'local_dir', None)
+        if not raw_path:
+            return None
+        with os.scandir(os.path.join(raw_path, directory)) as entries:
+            return {
+                os.path.join(directory, entry.name)
+                for entry in entries
+                if entry.is_file()
+            }
+    except FileNotFoundError:
+        return set()
+    except Exception:
+        return None
+
+
+def get_upload_index(archive: 'EntryArchive') -> UploadIndex:
+    context = archive.m_context
+    upload_id = archive.metadata.upload_id
+    index = _upload_indices.get(context)
+    if index is None or index.upload_id != upload_id:
+        index = UploadIndex(upload_id)
+        _upload_indices[context] = index
+    return index
+
+
 def get_entry_id_from_file_name(file_name: str, archive: 'EntryArchive') -> str:
-    from nomad.utils import hash
+    if archive.m_context is None:
+        from nomad.utils import hash
+
+        return hash(archive.metadata.upload_id, file_name)
+    return get_upload_index(archive).entry_id(file_name)
+
+
+def find_archive(archive: 'EntryArchive', file_name: str) -> str | None:
+    """
+    Returns the reference to the entry of the given raw file, if the file exists.
+    """
+    if not get_upload_index(archive).exists(file_name, archive.m_context):
+        return None
+    return get_reference(
+        archive.metadata.upload_id, get_entry_id_from_file_name(file_name, archive)
+    )
+
+
+def write_entry(
+    entity: 'ArchiveSection',
+    archive: 'EntryArchive',
+    file_name: str,
+    process: bool,
+    compact: bool = False,
+) -> None:
+    """
+    Writes the section as the data of a new entry. With `compact`, the raw file is
+    written as minified JSON directly instead of the indented JSON written by
+    `update_entry`, and processing is triggered through the context.
+    """
+    context = archive.m_context
+    data = entity.m_to_dict(with_root_def=True)
+    if not compact:
+        with context.update_entry(file_name, write=True, process=process) as entry:
+            entry['data'] = data
+        return
 
-    return hash(archive.metadata.upload_id, file_name)
+    with context.raw_file(file_name, 'w') as f:
+        json.dump({'data': data}, f, separators=(',', ':'))
+    if process:
+        context.process_updated_raw_file(file_name, allow_modify=True)
 
 
 def create_archive(
@@ -41,12 +229,181 @@ def create_archive(
     archive: 'EntryArchive',
     file_name: str,
     overwrite: bool = False,
+    compact: bool = False,
 ) -> str:
-    if overwrite or not archive.m_context.raw_path_exists(file_name):
-        with archive.m_context.update_entry(
-            file_name, write=True, process=True
-        ) as entry:
-            entry['data'] = entity.m_to_dict(with_root_def=True)
+    index = get_upload_index(archive)
+    if overwrite or not index.exists(file_name, archive.m_context, recheck=True):
+        write_entry(entity, archive, file_name, process=True, compact=compact)
+        index.add(file_name)
     return get_reference(
         archive.metadata.upload_id, get_entry_id_from_file_name(file_name, archive)
     )
+
+
+def create_archives(
+    entities: list[tuple['ArchiveSection', str]],
+    archive: 'EntryArchive',
+    overwrite: bool = False,
+    compact: bool = False,
+) -> list[str]:
+    """
+    Creates entries for many sections with their file names at once. All raw files
+    are written first and their processing is triggered after the last write.
+    Returns the references of all entries, including the ones that existed already.
+    """
+    context = archive.m_context
+    index = get_upload_index(archive)
+    written = []
+    for entity, file_name in entities:
+        if overwrite or not index.exists(file_name, context, recheck=True):
+            write_entry(entity, archive, file_name, process=False, compact=compact)
+            index.add(file_name)
+            written.append(file_name)
+
+    for file_name in written:
+        context.process_updated_raw_file(file_name, allow_modify=True)
+
+    return [
+        get_reference(
+            archive.metadata.upload_id, get_entry_id_from_file_name(file_name, archive)
+        )
+        for _, file_name in entities
+    ]
+
+
+class LazyEntryPoint:
+    """
+    The configuration of a plugin entry point, which is only looked up on first
+    access. Modules can then be imported before the plugins are loaded, and without
+    loading them.
+    """
+
+    def __init__(self, entry_point_id: str):
+        object.__setattr__(self, '_entry_point_id', entry_point_id)
+        object.__setattr__(self, '_entry_point', None)
+
+    def _resolve(self):
+        if self._entry_point is None:
+            from nomad.config import config
+
+            entry_point = config.get_plugin_entry_point(self._entry_point_id)
+            object.__setattr__(self, '_entry_point', entry_point)
+        return self._entry_point
+
+    def __getattr__(self, name: str):
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name: str, value) -> None:
+        setattr(self._resolve(), name, value)
+
+
+class BufferedLogger:
+    """
+    Records log calls instead of emitting them, so that output produced on worker
+    threads can be replayed in a deterministic order on the actual logger.
+    """
+
+    def __init__(self):
+        self.records: list[tuple[str, str, tuple, dict]] = []
+
+    def __getattr__(self, method: str):
+        def record(event: str, *args, **kwargs):
+            if kwargs.get('exc_info') is True:
+                # resolve now, the exception is gone by the time of the replay
+                kwargs['exc_info'] = sys.exc_info()
+            self.records.append((method, event, args, kwargs))
+
+        return record
+
+    def replay(self, logger: 'BoundLogger') -> None:
+        for method, event, args, kwargs in self.records:
+            getattr(logger, method)(event, *args, **kwargs)
+        self.records.clear()
+
+
+class NormalizationTrace:
+    """
+    The spans recorded during the normalization of one entry.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.spans: list[dict] = []
+
+    def summary(self, top: int = 5) -> dict:
+        """
+        Returns the time since the first span together with the number and total
+        time of the spans by name, and the slowest spans.
+        """
+        totals: dict[str, dict] = {}
+        for span in self.spans:
+            total = totals.setdefault(span['span'], {'count': 0, 'seconds': 0.0})
+            total['count'] += 1
+            total['seconds'] += span['seconds']
+        slowest = sorted(self.spans, key=lambda span: span['seconds'], reverse=True)
+        return {
+            'seconds': time.perf_counter() - self.start,
+            'spans': totals,
+            'slowest': [
+                {key: span[key] for key in ('span', 'section_path', 'seconds')}
+                for span in slowest[:top]
+            ],
+        }
+
+
+_normalization_traces: 'WeakKeyDictionary[EntryArchive, NormalizationTrace]' = (
+    WeakKeyDictionary()
+)
+# spans are also recorded on the threads of `parallel_normalization`
+_normalization_traces_lock = threading.Lock()
+
+
+def section_path(section: 'ArchiveSection | None') -> str | None:
+    if section is None:
+        return None
+    try:
+        return section.m_path()
+    except Exception:
+        return None
+
+
+@contextmanager
+def trace_span(
+    archive: 'EntryArchive',
+    logger: 'BoundLogger',
+    name: str,
+    section: 'ArchiveSection | None' = None,
+    log: bool = False,
+    **counts,
+) -> Iterator[dict]:
+    """
+    Times the enclosed block as a span of the normalization of the archive's entry.
+    The span holds the path of the section and the given counts, which the block
+    can update through the yielded dict. With `log`, the finished span is logged at
+    debug level.
+    """
+    with _normalization_traces_lock:
+        trace = _normalization_traces.setdefault(archive, NormalizationTrace())
+    span = {'span': name, 'section_path': section_path(section), **counts}
+    start = time.perf_counter()
+    try:
+        yield span
+    finally:
+        span['seconds'] = time.perf_counter() - start
+        with _normalization_traces_lock:
+            trace.spans.append(span)
+        if log:
+            logger.debug('Normalization span.', **span)
+
+
+def pop_trace_summary(archive: 'EntryArchive', threshold: float | None) -> dict | None:
+    """
+    Removes the trace of the archive's entry and returns its summary if the
+    normalization took at least `threshold` seconds.
+    """
+    with _normalization_traces_lock:
+        trace = _normalization_traces.pop(archive, None)
+    if trace is None or threshold is None:
+        return None
+    summary = trace.summary()
+    return summary if summary['seconds'] >= threshold else None
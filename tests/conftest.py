@@ -0,0 +1,135 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from nomad.config import config
+
+FDC_DATASET = os.path.join(os.path.dirname(__file__), 'data', 'fdc', 'search.json')
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--memory-budget-factor',
+        type=float,
+        default=1.0,
+        help='Scales the allocation budgets of the memory tests.',
+    )
+    parser.addoption(
+        '--import-time-budget',
+        type=float,
+        default=1.0,
+        help='Seconds the schema package may take to import on top of NOMAD.',
+    )
+
+
+@pytest.fixture
+def match_mainfile():
+    """
+    Matches a file against a parser with the file header read like in the
+    upload processing.
+    """
+
+    def match(parser, mainfile, mime='text/plain'):
+        with open(mainfile, 'rb') as f:
+            buffer = f.read(config.process.parser_matching_size)
+        return parser.is_mainfile(mainfile, mime, buffer, buffer.decode('utf-8'))
+
+    return match
+
+
+class FDCHandler(BaseHTTPRequestHandler):
+    """
+    Answers `/fdc/v1/foods/search` from the foods of the server. A food matches if
+    its description contains all words of the query. The faults configured on the
+    server are injected before the response, each for its number of requests.
+    """
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        self.server.requests.append(params)
+        time.sleep(self.server.latency)
+        if url.path != '/fdc/v1/foods/search':
+            self.respond(404, b'{}')
+        elif self.server.inject('timeouts'):
+            time.sleep(self.server.timeout_delay)
+            self.respond(200, b'{"foods": []}')
+        elif self.server.inject('rate_limited'):
+            self.respond(429, b'{"error": "OVER_RATE_LIMIT"}', {'Retry-After': '1'})
+        elif self.server.inject('malformed'):
+            self.respond(200, b'{"foods": [{"fdcId": 1, "descr')
+        else:
+            words = ' '.join(params.get('query', [''])).lower().split()
+            page_size = int(params.get('pageSize', ['50'])[0])
+            foods = [
+                food
+                for food in self.server.foods
+                if all(word in food['description'].lower() for word in words)
+            ]
+            content = {'totalHits': len(foods), 'foods': foods[:page_size]}
+            self.respond(200, json.dumps(content).encode())
+
+    def respond(self, status: int, content: bytes, headers: dict | None = None):
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(content)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(content)
+        except OSError:
+            # the client gave up waiting
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+class FDCServer(ThreadingHTTPServer):
+    """
+    A local stand-in of the FoodData Central search API. `latency` delays every
+    response, while `timeouts`, `rate_limited` and `malformed` give the number of
+    following requests that are answered too late, with status 429 or with
+    truncated JSON.
+    """
+
+    def __init__(self, foods: list[dict]):
+        super().__init__(('127.0.0.1', 0), FDCHandler)
+        self.foods = foods
+        self.requests: list[dict] = []
+        self.latency = 0.0
+        self.timeout_delay = 1.0
+        self.timeouts = 0
+        self.rate_limited = 0
+        self.malformed = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_port}/fdc/v1'
+
+    def inject(self, fault: str) -> bool:
+        with self.lock:
+            if getattr(self, fault) <= 0:
+                return False
+            setattr(self, fault, getattr(self, fault) - 1)
+            return True
+
+
+@pytest.fixture
+def fdc_server():
+    """
+    Serves the bundled FoodData Central fixture dataset on a local port.
+    """
+    with open(FDC_DATASET, encoding='utf-8') as f:
+        server = FDCServer(json.load(f)['foods'])
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
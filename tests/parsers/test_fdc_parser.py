@@ -0,0 +1,92 @@
+import io
+import json
+
+import pytest
+from nomad.datamodel import EntryArchive, EntryMetadata
+from nomad.utils import get_logger
+
+from nomad_tajine_plugin.parsers import fdc_parser, fdc_parser_entry_point
+from nomad_tajine_plugin.schema_packages import schema_package
+from nomad_tajine_plugin.schema_packages.schema_package import Ingredient
+
+
+def test_iter_json_array(monkeypatch):
+    # decode across many chunk boundaries
+    monkeypatch.setattr(fdc_parser, 'CHUNK_SIZE', 7)
+    items = [{'fdcId': index, 'description': 'a, "b" ]'} for index in range(20)]
+    f = io.StringIO(json.dumps({'version': 1, 'SRLegacyFoods': items, 'x': []}))
+
+    assert list(fdc_parser.iter_json_array(f, fdc_parser.FDC_JSON_KEYS)) == items
+
+
+@pytest.mark.parametrize(
+    'content',
+    [
+        '{"data": {"m_def": "Recipe"}, "SRLegacyFoods": []}',
+        '"id","fdc_id","nutrient_id","amount"\n',
+        '{"FoundationFoods": []}',
+    ],
+)
+def test_reject_file(tmp_path, match_mainfile, content):
+    mainfile = tmp_path / ('food.csv' if content.startswith('"id"') else 'x.json')
+    mainfile.write_text(content)
+    assert not match_mainfile(fdc_parser_entry_point.load(), str(mainfile))
+
+
+@pytest.mark.parametrize(
+    'mainfile', ['tests/data/fdc/sr_legacy_food.json', 'tests/data/fdc/food.csv']
+)
+def test_parse_file(mainfile, match_mainfile):
+    parser = fdc_parser_entry_point.load()
+    keys = match_mainfile(parser, mainfile)
+    assert keys == ['173410', '172420']
+
+    child_archives = {key: EntryArchive(metadata=EntryMetadata()) for key in keys}
+    parser.parse(mainfile, EntryArchive(), get_logger(__name__), child_archives)
+
+    butter = child_archives['173410'].data
+    assert isinstance(butter, Ingredient)
+    assert butter.name == 'Butter, salted'
+    assert butter.lab_id == 'butter_salted'
+    assert butter.ndb_id == 1001  # noqa: PLR2004
+    assert butter.diet_type == 'vegetarian'
+    assert butter.calories_per_100_g.magnitude == pytest.approx(717)
+    assert butter.fat_per_100_g.magnitude == pytest.approx(81.11)
+    lentils = child_archives['172420'].data
+    assert lentils.diet_type == 'vegan'
+    assert lentils.protein_per_100_g.magnitude == pytest.approx(24.63)
+
+
+def test_parse_foundation_food(tmp_path, monkeypatch, match_mainfile):
+    # energy is only given by Atwater factors, without nutrient 1008
+    food = {
+        'fdcId': 321358,
+        'description': 'Hummus, commercial',
+        'foodCategory': {'description': 'Legumes and Legume Products'},
+        'foodNutrients': [
+            {'nutrient': {'id': 1003}, 'amount': 7.35},
+            {'nutrient': {'id': 2047}, 'amount': 229.0},
+            {'nutrient': {'id': 2048}, 'amount': 237.0},
+        ],
+    }
+    mainfile = tmp_path / 'foundation_food.json'
+    mainfile.write_text(json.dumps({'FoundationFoods': [food]}))
+    parser = fdc_parser_entry_point.load()
+    keys = match_mainfile(parser, str(mainfile))
+    assert keys == ['321358']
+
+    archive = EntryArchive(metadata=EntryMetadata())
+    parser.parse(
+        str(mainfile), EntryArchive(), get_logger(__name__), {'321358': archive}
+    )
+
+    def lookup(*args, **kwargs):
+        raise AssertionError('imported foods are not looked up')
+
+    monkeypatch.setattr(schema_package, 'get_usda_data', lookup)
+    hummus = archive.data
+    hummus.normalize(archive, get_logger(__name__))
+    assert hummus.fdc_id == 321358  # noqa: PLR2004
+    assert hummus.diet_type == 'vegan'
+    assert hummus.protein_per_100_g.magnitude == pytest.approx(7.35)
+    assert hummus.calories_per_100_g.magnitude == pytest.approx(237)
@@ -0,0 +1,106 @@
+import json
+
+import pytest
+from nomad.datamodel import EntryArchive, EntryMetadata
+from nomad.utils import get_logger
+
+from nomad_tajine_plugin.parsers import jsonld_parser_entry_point
+from nomad_tajine_plugin.parsers.jsonld_parser import (
+    parse_duration,
+    parse_ingredient_line,
+)
+from nomad_tajine_plugin.schema_packages.schema_package import (
+    IngredientAmount,
+    IngredientPiece,
+    IngredientVolume,
+)
+
+
+@pytest.mark.parametrize(
+    'line, section, name, field, value',
+    [
+        ('2 tbsp olive oil', IngredientVolume, 'olive oil', 'volume', 29.5736),
+        ('1 1/2 cups flour', IngredientVolume, 'flour', 'volume', 354.882),
+        ('½ cup sugar', IngredientVolume, 'sugar', 'volume', 118.294),
+        ('200g butter, softened', IngredientAmount, 'butter', 'mass', 200),
+        ('1 lb ground beef', IngredientAmount, 'ground beef', 'mass', 453.592),
+        ('2-3 cloves garlic', IngredientPiece, 'garlic', 'pieces', 2.5),
+        ('2 tomatoes', IngredientPiece, 'tomatoes', 'pieces', 2),
+        ('a pinch of salt', IngredientVolume, 'salt', 'volume', 0.31),
+        ('2 pinches salt', IngredientVolume, 'salt', 'volume', 0.62),
+        ('3 dashes hot sauce', IngredientVolume, 'hot sauce', 'volume', 1.86),
+        ('4 leaves basil', IngredientPiece, 'basil', 'pieces', 4),
+        ('2 bunches parsley', IngredientPiece, 'parsley', 'pieces', 2),
+        ('2 slices bread', IngredientPiece, 'bread', 'pieces', 2),
+        ('Pepper to taste', IngredientAmount, 'Pepper', 'mass', None),
+    ],
+)
+def test_parse_ingredient_line(line, section, name, field, value):  # noqa: PLR0913
+    ingredient = parse_ingredient_line(line)
+    assert type(ingredient) is section
+    assert ingredient.name == name
+    quantity = getattr(ingredient, field)
+    if value is None:
+        assert quantity is None
+    else:
+        assert getattr(quantity, 'magnitude', quantity) == pytest.approx(value)
+
+
+def test_parse_duration():
+    assert parse_duration('PT1H30M') == pytest.approx(90)
+    assert parse_duration('P0DT0H20M') == pytest.approx(20)
+    assert parse_duration('30 minutes') is None
+
+
+def test_parse_file(tmp_path, match_mainfile):
+    mainfile = 'tests/data/jsonld/shakshuka.html'
+    parser = jsonld_parser_entry_point.load()
+    keys = match_mainfile(parser, mainfile, 'text/html')
+    assert keys == ['0']
+
+    child_archives = {key: EntryArchive(metadata=EntryMetadata()) for key in keys}
+    parser.parse(mainfile, EntryArchive(), get_logger(__name__), child_archives)
+
+    recipe = child_archives['0'].data
+    assert recipe.name == 'Shakshuka'
+    assert recipe.summary == 'Eggs poached in a spiced tomato & pepper sauce.'
+    assert recipe.authors == 'Chef Heiko'
+    assert recipe.cuisine == 'North African, Middle Eastern'
+    assert recipe.number_of_servings == 4  # noqa: PLR2004
+    assert len(recipe.steps) == 3  # noqa: PLR2004
+    assert sum(step.duration.magnitude for step in recipe.steps) == pytest.approx(30)
+    # ingredients not mentioned in any step are added to the first one
+    assert [i.name for i in recipe.steps[0].ingredients] == [
+        'olive oil',
+        'onion',
+        'Salt',
+    ]
+    assert [i.name for i in recipe.steps[1].ingredients] == [
+        'canned tomatoes',
+        'cumin',
+    ]
+    assert [i.name for i in recipe.steps[2].ingredients] == ['eggs']
+
+    # plain JSON files and pages without recipes
+    mainfile = str(tmp_path / 'recipes.json')
+    with open(mainfile, 'w') as f:
+        json.dump([{'@type': 'Recipe', 'name': 'Toast'}] * 2, f)
+    assert match_mainfile(parser, mainfile, 'application/json') == ['0', '1']
+    mainfile = str(tmp_path / 'page.html')
+    with open(mainfile, 'w') as f:
+        f.write('<html><body>No recipe here</body></html>')
+    assert not match_mainfile(parser, mainfile, 'text/html')
+
+
+@pytest.mark.parametrize(
+    'name, content',
+    [
+        ('entry.archive.json', '{"data": {"name": "Recipe"}}'),
+        ('notes.html', 'Recipe notes <html>'),
+        ('page.html', '<html><script type="application/ld+json">{}</script></html>'),
+    ],
+)
+def test_reject_file(tmp_path, match_mainfile, name, content):
+    mainfile = tmp_path / name
+    mainfile.write_text(content)
+    assert not match_mainfile(jsonld_parser_entry_point.load(), str(mainfile))
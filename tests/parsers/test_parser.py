@@ -1,13 +1,111 @@
-import logging
+import pytest
+from nomad.datamodel import EntryArchive, EntryMetadata
+from nomad.utils import get_logger
 
-from nomad.datamodel import EntryArchive
+from nomad_tajine_plugin.parsers import parser_entry_point
+from nomad_tajine_plugin.parsers.parser import record_from_row
+from nomad_tajine_plugin.schema_packages.schema_package import (
+    HeatingCoolingStep,
+    IngredientVolume,
+    Recipe,
+)
 
-from nomad_tajine_plugin.parsers.parser import NewParser
 
+@pytest.mark.parametrize(
+    'mainfile',
+    ['tests/data/collection.recipes.jsonl', 'tests/data/collection.recipes.csv'],
+)
+def test_parse_file(mainfile, match_mainfile):
+    parser = parser_entry_point.load()
+    keys = match_mainfile(parser, mainfile)
+    assert keys == ['0', '1']
 
-def test_parse_file():
-    parser = NewParser()
-    archive = EntryArchive()
-    parser.parse('tests/data/example.out', archive, logging.getLogger())
+    archive = EntryArchive(metadata=EntryMetadata())
+    child_archives = {key: EntryArchive(metadata=EntryMetadata()) for key in keys}
+    parser.parse(mainfile, archive, get_logger(__name__), child_archives)
 
-    assert archive.workflow2.name == 'test'
+    flatbread = child_archives['0'].data
+    assert isinstance(flatbread, Recipe)
+    assert flatbread.name == 'Flatbread'
+    assert flatbread.number_of_servings == 2  # noqa: PLR2004
+    assert isinstance(flatbread.steps[0].ingredients[1], IngredientVolume)
+    assert isinstance(flatbread.steps[1], HeatingCoolingStep)
+    assert flatbread.steps[1].tools[0].name == 'Pan'
+    assert child_archives['1'].data.steps[0].ingredients[0].pieces == 2  # noqa: PLR2004
+
+
+def test_parse_invalid_record(tmp_path, match_mainfile):
+    mainfile = str(tmp_path / 'broken.recipes.jsonl')
+    with open(mainfile, 'w') as f:
+        f.write('{"name": "Toast"}\n\n{"name": \n')
+    parser = parser_entry_point.load()
+    keys = match_mainfile(parser, mainfile)
+    assert keys == ['0', '1']
+
+    child_archives = {key: EntryArchive(metadata=EntryMetadata()) for key in keys}
+    parser.parse(mainfile, EntryArchive(), get_logger(__name__), child_archives)
+    assert child_archives['0'].data.name == 'Toast'
+    assert child_archives['1'].data is None
+
+
+def test_parse_many_records(tmp_path, match_mainfile):
+    mainfile = str(tmp_path / 'many.recipes.jsonl')
+    with open(mainfile, 'w') as f:
+        for index in range(25):
+            f.write(f'{{"name": "Recipe {index}", "number_of_servings": {index}}}\n')
+        f.write('not a recipe\n')
+    parser = parser_entry_point.load()
+    keys = match_mainfile(parser, mainfile)
+
+    child_archives = {key: EntryArchive(metadata=EntryMetadata()) for key in keys}
+    parser.parse(mainfile, EntryArchive(), get_logger(__name__), child_archives)
+
+    assert [child_archives[str(index)].data.name for index in range(25)] == [
+        f'Recipe {index}' for index in range(25)
+    ]
+    assert child_archives['25'].data is None
+
+
+@pytest.mark.parametrize(
+    'name, content',
+    [
+        ('bom.recipes.csv', 'name,number_of_servings\nToast,2\n'),
+        ('bom.recipes.jsonl', '{"name": "Toast", "number_of_servings": 2}\n'),
+    ],
+)
+def test_parse_file_with_bom(tmp_path, match_mainfile, name, content):
+    mainfile = str(tmp_path / name)
+    with open(mainfile, 'w', encoding='utf-8-sig') as f:
+        f.write(content)
+    parser = parser_entry_point.load()
+    keys = match_mainfile(parser, mainfile)
+    assert keys == ['0']
+
+    child_archives = {'0': EntryArchive(metadata=EntryMetadata())}
+    parser.parse(mainfile, EntryArchive(), get_logger(__name__), child_archives)
+    assert child_archives['0'].data.name == 'Toast'
+    assert child_archives['0'].data.number_of_servings == 2  # noqa: PLR2004
+
+
+def test_record_from_row():
+    record = record_from_row(
+        {'name': 'Toast', 'number_of_servings': '2', 'duration': '7.5', 'cuisine': ''}
+    )
+    assert record == {'name': 'Toast', 'number_of_servings': 2, 'duration': 7.5}
+    assert type(record['number_of_servings']) is int
+
+
+@pytest.mark.parametrize(
+    'content',
+    [
+        'fdc_id,description\n1,Butter\n',
+        '[{"name": "Toast"}]\n',
+        '{"id": 1, "value": 2}\n',
+        # a header without records
+        'name,number_of_servings\n',
+    ],
+)
+def test_reject_file(tmp_path, match_mainfile, content):
+    mainfile = tmp_path / 'other.recipes.csv'
+    mainfile.write_text(content)
+    assert not match_mainfile(parser_entry_point.load(), str(mainfile))
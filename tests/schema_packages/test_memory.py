@@ -0,0 +1,60 @@
+import gc
+import tracemalloc
+
+import pytest
+from benchmark_normalization import BENCHMARKS
+
+KIB = 1024
+
+# (fixed, per item) budgets in KiB of the peak and the retained allocations
+BUDGETS = {
+    'Ingredient.normalize': {'peak': (64, 4), 'retained': (32, 3)},
+    'IngredientAmount.normalize': {'peak': (64, 4), 'retained': (32, 2)},
+    'Recipe.normalize': {'peak': (128, 6), 'retained': (32, 2)},
+    'RecipeScaler.normalize': {'peak': (256, 16), 'retained': (32, 1)},
+}
+SIZES = [10, 30, 100]
+# scaling copies the recipe for every target serving, which is slow to trace
+MAX_SIZES = {'RecipeScaler.normalize': 30}
+
+
+def measure_allocations(run) -> tuple[int, int]:
+    """
+    Returns the peak and the retained allocations of a call in bytes.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return peak - before, retained - before
+
+
+@pytest.mark.parametrize(
+    'name, size',
+    [
+        (name, size)
+        for name in BUDGETS
+        for size in SIZES
+        if size <= MAX_SIZES.get(name, size)
+    ],
+)
+def test_memory_budget(request, record_property, name, size):
+    factor = request.config.getoption('--memory-budget-factor')
+    run = BENCHMARKS[name](size, 0)
+    peak, retained = measure_allocations(run)
+    record_property('peak_bytes', peak)
+    record_property('retained_bytes', retained)
+
+    for measure, value in (('peak', peak), ('retained', retained)):
+        fixed, per_item = BUDGETS[name][measure]
+        budget = factor * (fixed + per_item * size) * KIB
+        assert value <= budget, (
+            f'{name} with {size} items: {measure} allocations of {value / KIB:.0f} '
+            f'KiB exceed the budget of {budget / KIB:.0f} KiB'
+        )
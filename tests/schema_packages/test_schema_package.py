@@ -1,6 +1,30 @@
 import os.path
+import threading
+import time
 
+import pytest
 from nomad.client import normalize_all, parse
+from nomad.datamodel import EntryArchive, EntryMetadata
+from nomad.datamodel.metainfo.basesections import EntityReference
+from nomad.normalizing.metainfo import MetainfoNormalizer
+from nomad.utils import get_logger
+from structlog.testing import capture_logs
+
+from nomad_tajine_plugin.schema_packages import schema_package
+from nomad_tajine_plugin.schema_packages.schema_package import (
+    Ingredient,
+    IngredientAmount,
+    IngredientPiece,
+    IngredientTotal,
+    IngredientVolume,
+    MealPlan,
+    PlannedMeal,
+    Recipe,
+    RecipeScaler,
+    RecipeStep,
+    ScaledRecipeVariant,
+    ShoppingList,
+)
 
 
 def test_schema_package():
@@ -9,3 +33,408 @@ def test_schema_package():
     normalize_all(entry_archive)
 
     assert entry_archive.data.name == 'Moroccan Chicken Tagine'
+
+
+def create_recipe_archive() -> EntryArchive:
+    flour = Ingredient(
+        name='Flour',
+        lab_id='flour',
+        diet_type='vegetarian',
+        density=590,
+        calories_per_100_g=364,
+        fat_per_100_g=1,
+        protein_per_100_g=10,
+        carbohydrates_per_100_g=76,
+    )
+    salt = Ingredient(
+        name='Salt',
+        lab_id='salt',
+        diet_type='vegan',
+        density=1200,
+        calories_per_100_g=0,
+        fat_per_100_g=0,
+        protein_per_100_g=0,
+        carbohydrates_per_100_g=0,
+    )
+    recipe = Recipe(
+        name='Dough',
+        number_of_servings=2,
+        steps=[
+            RecipeStep(
+                duration=5,
+                ingredients=[
+                    IngredientAmount(name='Flour', mass=200, reference=flour),
+                    IngredientVolume(name='Salt', volume=5, reference=salt),
+                ],
+            ),
+            RecipeStep(
+                duration=10,
+                ingredients=[IngredientPiece(name='Salt', pieces=2, reference=salt)],
+            ),
+        ],
+    )
+    return EntryArchive(data=recipe, metadata=EntryMetadata())
+
+
+@pytest.mark.parametrize('parallel', [False, True])
+def test_recipe_normalization(monkeypatch, parallel):
+    monkeypatch.setattr(
+        schema_package.configuration, 'parallel_normalization', parallel
+    )
+    archive = create_recipe_archive()
+    MetainfoNormalizer().normalize(archive, get_logger(__name__))
+    recipe = archive.data
+
+    assert recipe.duration.magnitude == pytest.approx(15)
+    assert recipe.calories.magnitude == pytest.approx(728)
+    assert recipe.calories_per_serving.magnitude == pytest.approx(364)
+    assert recipe.diet_type == 'vegetarian'
+    assert [ingredient.name for ingredient in recipe.ingredients] == ['Flour', 'Salt']
+    assert recipe.ingredients[1].mass.magnitude == pytest.approx(106)
+    assert recipe.number_of_ingredients == 2  # noqa: PLR2004
+    assert recipe.ingredient_lab_ids == ['flour', 'salt']
+    assert recipe.calorie_density.magnitude == pytest.approx(728 / 306)
+    assert recipe.protein_ratio == pytest.approx(80 / 728)
+    assert len(recipe.minhash_signature) == 64  # noqa: PLR2004
+    assert len(recipe.similarity_keys) == 16  # noqa: PLR2004
+
+
+def test_parallel_reference_search(monkeypatch):
+    found = {'flour': Ingredient(name='Flour', lab_id='flour', density=590)}
+    lock = threading.Lock()
+    searching = []
+    overlaps = []
+    dereferenced = []
+
+    def slow_search(self, archive, logger):
+        if self.reference is not None:
+            dereferenced.append(threading.current_thread())
+            self.lab_id = self.lab_id or self.reference.lab_id
+            return
+        with lock:
+            searching.append(self.lab_id)
+            overlaps.append(len(searching))
+        time.sleep(0.05)
+        with lock:
+            searching.remove(self.lab_id)
+        logger.info('Searched ingredient.', lab_id=self.lab_id)
+        self.reference = found.get(self.lab_id)
+
+    created = []
+
+    def create_archives(entities, archive, overwrite, compact):
+        created.extend(file_name for _, file_name in entities)
+        return [ingredient for ingredient, _ in entities]
+
+    monkeypatch.setattr(schema_package.configuration, 'parallel_normalization', True)
+    monkeypatch.setattr(EntityReference, 'normalize', slow_search)
+    monkeypatch.setattr(schema_package, 'create_archives', create_archives)
+    names = [['Flour', 'Salt'], ['Sugar', 'Salt'], ['Flour', 'Sugar']]
+    butter = Ingredient(name='Butter', lab_id='butter')
+    recipe = Recipe(
+        name='Dough',
+        number_of_servings=1,
+        steps=[
+            RecipeStep(
+                ingredients=[IngredientAmount(name=name, mass=10) for name in step]
+            )
+            for step in names
+        ],
+    )
+    recipe.steps[0].ingredients.append(IngredientAmount(reference=butter, mass=10))
+    archive = EntryArchive(data=recipe, metadata=EntryMetadata())
+    with capture_logs() as logs:
+        MetainfoNormalizer().normalize(archive, get_logger(__name__))
+
+    assert max(overlaps) > 1
+    # given references are only dereferenced on the normalizing thread
+    assert dereferenced
+    assert set(dereferenced) == {threading.current_thread()}
+    assert recipe.steps[0].ingredients[2].lab_id == 'butter'
+    # the logs of every ingredient are replayed in step order, missing ones are
+    # searched again after the normalization delay
+    lab_ids = [name.lower() for step in names for name in step]
+    assert [
+        log['lab_id'] for log in logs if log['event'] == 'Searched ingredient.'
+    ] == [
+        searched
+        for lab_id in lab_ids
+        for searched in ([lab_id] if lab_id in found else [lab_id, lab_id])
+    ]
+    assert created == ['salt.archive.json', 'sugar.archive.json']
+    salts = [i for step in recipe.steps for i in step.ingredients if i.name == 'Salt']
+    assert salts[0].reference is salts[1].reference
+    assert recipe.steps[0].ingredients[0].reference is found['flour']
+
+
+def test_recipe_normalization_spans(monkeypatch):
+    monkeypatch.setattr(schema_package.configuration, 'trace_normalization', True)
+    monkeypatch.setattr(
+        schema_package.configuration, 'slow_normalization_threshold', 0.0
+    )
+    archive = create_recipe_archive()
+    with capture_logs() as logs:
+        MetainfoNormalizer().normalize(archive, get_logger(__name__))
+
+    spans = [log for log in logs if log['event'] == 'Normalization span.']
+    assert [span['span'] for span in spans if span['span'].endswith('normalize')] == [
+        'IngredientAmount.normalize',
+        'IngredientVolume.normalize',
+        'IngredientPiece.normalize',
+        'Recipe.normalize',
+    ]
+    assert spans[0]['section_path'] == '/data/steps/0/ingredients/0'
+    assert spans[-1]['steps'] == 2  # noqa: PLR2004
+    assert spans[-1]['ingredients'] == 2  # noqa: PLR2004
+    (summary,) = [log for log in logs if log['event'] == 'Slow normalization.']
+    assert summary['spans']['reference_search']['count'] == 3  # noqa: PLR2004
+    assert summary['spans']['aggregate']['count'] == 1
+    assert summary['seconds'] >= spans[-1]['seconds']
+
+
+def test_compact_recipe_aggregate(monkeypatch):
+    monkeypatch.setattr(schema_package.configuration, 'compact_archives', True)
+    archive = create_recipe_archive()
+    MetainfoNormalizer().normalize(archive, get_logger(__name__))
+    recipe = archive.data
+
+    assert all(isinstance(row, IngredientTotal) for row in recipe.ingredients)
+    assert [row.step_indices for row in recipe.ingredients] == [[0], [0, 1]]
+    assert recipe.calories.magnitude == pytest.approx(728)
+    assert 'volume' not in recipe.m_to_dict()['ingredients'][1]
+
+
+def test_meal_plan(monkeypatch):
+    monkeypatch.setattr(
+        schema_package, 'get_entry_hashes', lambda entry_ids: {'recipe1': 'hash1'}
+    )
+    recipe = Recipe(
+        name='Salad',
+        duration=30,
+        diet_type='vegan',
+        calories_per_serving=500,
+        fat_per_serving=10,
+        protein_per_serving=20,
+        carbohydrates_per_serving=50,
+    )
+    # cached values of an unchanged recipe, the reference is never resolved
+    cached_meal = PlannedMeal(
+        day=2,
+        recipe='../uploads/upload1/archive/recipe1#data',
+        recipe_entry_hash='hash1',
+        diet_type='vegetarian',
+        duration=10,
+        calories_per_serving=300,
+        fat_per_serving=1,
+        protein_per_serving=1,
+        carbohydrates_per_serving=1,
+    )
+    meal_plan = MealPlan(
+        name='Week',
+        meals=[PlannedMeal(day=1, recipe=recipe, servings=2), cached_meal],
+    )
+    archive = EntryArchive(data=meal_plan, metadata=EntryMetadata())
+    meal_plan.normalize(archive, get_logger(__name__))
+
+    assert meal_plan.number_of_days == 2  # noqa: PLR2004
+    assert [day.calories.magnitude for day in meal_plan.days] == [1000, 300]
+    assert meal_plan.calories.magnitude == pytest.approx(1300)
+    assert meal_plan.duration.magnitude == pytest.approx(40)
+    assert meal_plan.diet_type == 'vegetarian'
+
+
+def test_shopping_list(monkeypatch):
+    batched_recipe = {
+        'steps': [
+            {'ingredients': [{'name': 'Flour', 'lab_id': 'flour', 'mass': 300.0}]},
+            {'ingredients': [{'name': 'Eggs', 'lab_id': 'eggs', 'pieces': 2.0}]},
+        ]
+    }
+    monkeypatch.setattr(
+        schema_package,
+        'read_archive_data',
+        lambda upload_id, entry_ids: (batched_recipe for _ in entry_ids),
+    )
+    archive = create_recipe_archive()
+    MetainfoNormalizer().normalize(archive, get_logger(__name__))
+    shopping_list = ShoppingList(
+        name='Catering',
+        recipes=[archive.data, '../upload/archive/recipe1#data'],
+    )
+    archive = EntryArchive(
+        data=shopping_list, metadata=EntryMetadata(upload_id='upload1')
+    )
+    shopping_list.normalize(archive, get_logger(__name__))
+
+    items = {item.lab_id: item for item in shopping_list.items}
+    assert items['flour'].mass.magnitude == pytest.approx(500)
+    assert items['flour'].number_of_recipes == 2  # noqa: PLR2004
+    assert items['salt'].volume.magnitude == pytest.approx(5)
+    assert items['salt'].pieces == pytest.approx(2)
+    assert items['eggs'].mass is None
+
+
+def test_shopping_list_recipe_scalers():
+    archive = create_recipe_archive()
+    MetainfoNormalizer().normalize(archive, get_logger(__name__))
+    scalers = [
+        RecipeScaler(
+            name='Dough for 6', original_recipe=archive.data, scaling_factor=3.0
+        ),
+        RecipeScaler(
+            name='Dough for 1', original_recipe=archive.data, desired_servings=1
+        ),
+        RecipeScaler(
+            name='Dough for 4', original_recipe=archive.data, target_servings=[4]
+        ),
+    ]
+    shopping_list = ShoppingList(
+        name='Catering', recipes=[archive.data], recipe_scalers=scalers
+    )
+    archive = EntryArchive(data=shopping_list, metadata=EntryMetadata())
+    shopping_list.normalize(archive, get_logger(__name__))
+
+    items = {item.lab_id: item for item in shopping_list.items}
+    assert items['flour'].mass.magnitude == pytest.approx((1 + 3 + 0.5 + 2) * 200)
+    assert items['flour'].number_of_recipes == 4  # noqa: PLR2004
+    assert items['salt'].pieces == pytest.approx(6.5 * 2)
+    assert items['salt'].volume.magnitude == pytest.approx(6.5 * 5)
+
+
+def test_shopping_list_recipe_scalers_batched(monkeypatch):
+    entries = {
+        'scaler1': {
+            'original_recipe': '../upload/archive/recipe1#data',
+            'variants': [{'scaling_factor': 2.0}, {'scaling_factor': 4.0}],
+        },
+        'scaler2': {
+            'original_recipe': '../uploads/upload1/archive/recipe1#data',
+            'target_servings': [1],
+        },
+        'recipe1': {
+            'number_of_servings': 2,
+            'steps': [{'ingredients': [{'name': 'Flour', 'mass': 100.0}]}],
+        },
+    }
+    reads = []
+
+    def read_archive_data(upload_id, entry_ids):
+        reads.append((upload_id, entry_ids))
+        return (entries[entry_id] for entry_id in entry_ids)
+
+    monkeypatch.setattr(schema_package, 'read_archive_data', read_archive_data)
+    shopping_list = ShoppingList(
+        name='Catering',
+        recipe_scalers=[
+            '../uploads/upload1/archive/scaler1#data',
+            '../upload/archive/scaler2#data',
+        ],
+    )
+    archive = EntryArchive(
+        data=shopping_list, metadata=EntryMetadata(upload_id='upload2')
+    )
+    shopping_list.normalize(archive, get_logger(__name__))
+
+    # one read per upload for the scalers and one for their original recipes
+    assert reads == [
+        ('upload1', ['scaler1']),
+        ('upload2', ['scaler2']),
+        ('upload1', ['recipe1', 'recipe1']),
+    ]
+    (flour,) = shopping_list.items
+    assert flour.mass.magnitude == pytest.approx((2 + 4 + 0.5) * 100)
+    assert flour.number_of_recipes == 3  # noqa: PLR2004
+
+
+@pytest.mark.parametrize('materialize', [False, True])
+def test_recipe_scaler(monkeypatch, materialize):
+    created = []
+    monkeypatch.setattr(schema_package, 'find_archive', lambda archive, file_name: None)
+    monkeypatch.setattr(
+        schema_package,
+        'create_archives',
+        lambda entities, archive, overwrite, compact: [
+            created.append(section) for section, _ in entities
+        ],
+    )
+    archive = create_recipe_archive()
+    MetainfoNormalizer().normalize(archive, get_logger(__name__))
+    scaler = RecipeScaler(
+        name='Dough for 6',
+        original_recipe=archive.data,
+        desired_servings=6,
+        materialize=materialize,
+    )
+    archive = EntryArchive(data=scaler, metadata=EntryMetadata())
+    scaler.normalize(archive, get_logger(__name__))
+
+    assert scaler.scaling_factor == pytest.approx(3)
+    assert scaler.calories.magnitude == pytest.approx(3 * 728)
+    assert len(created) == int(materialize)
+    if materialize:
+        assert created[0].number_of_servings == 6  # noqa: PLR2004
+        assert created[0].steps[0].ingredients[0].mass.magnitude == pytest.approx(600)
+
+
+def test_recipe_scaler_variants(monkeypatch):
+    created = []
+    # the recipe for 4 servings exists already from an earlier normalization
+    monkeypatch.setattr(
+        schema_package,
+        'find_archive',
+        lambda archive, file_name: (
+            '../upload/archive/existing#data' if '_x2.0_' in file_name else None
+        ),
+    )
+    monkeypatch.setattr(
+        schema_package,
+        'create_archives',
+        lambda entities, archive, overwrite, compact: [
+            created.append(file_name) for _, file_name in entities
+        ],
+    )
+    archive = create_recipe_archive()
+    MetainfoNormalizer().normalize(archive, get_logger(__name__))
+    scaler = RecipeScaler(
+        name='Dough variants',
+        original_recipe=archive.data,
+        target_servings=[2, 4, 8],
+        materialize=True,
+    )
+    archive = EntryArchive(data=scaler, metadata=EntryMetadata())
+    scaler.normalize(archive, get_logger(__name__))
+
+    assert scaler.scaled_recipe is None
+    assert [variant.scaling_factor for variant in scaler.variants] == [1, 2, 4]
+    assert [variant.calories.magnitude for variant in scaler.variants] == [
+        pytest.approx(728 * factor) for factor in (1, 2, 4)
+    ]
+    content_hash = scaler.original_recipe_hash[:12]
+    assert created == [f'dough_scaled_x4.0_{content_hash}.archive.json']
+    assert scaler.variants[1].m_get(ScaledRecipeVariant.scaled_recipe) is not None
+
+
+def test_recipe_scaler_file_names(monkeypatch):
+    created = []
+    monkeypatch.setattr(schema_package, 'find_archive', lambda archive, file_name: None)
+    monkeypatch.setattr(
+        schema_package,
+        'create_archives',
+        lambda entities, archive, overwrite, compact: [
+            created.append(file_name) for _, file_name in entities
+        ],
+    )
+    archive = create_recipe_archive()
+    MetainfoNormalizer().normalize(archive, get_logger(__name__))
+    scaler = RecipeScaler(name='Dough', original_recipe=archive.data)
+    scaler.scale_recipes(
+        archive.data, [1.001, 1.002, 1 / 3], archive, get_logger(__name__)
+    )
+
+    # factors that round to the same digits do not share an entry
+    content_hash = scaler.original_recipe_hash[:12]
+    assert created == [
+        f'dough_scaled_x1.001_{content_hash}.archive.json',
+        f'dough_scaled_x1.002_{content_hash}.archive.json',
+        f'dough_scaled_x0.3333333333333333_{content_hash}.archive.json',
+    ]
@@ -0,0 +1,52 @@
+import time
+
+import pytest
+from nomad.datamodel import EntryArchive, EntryMetadata
+from nomad.utils import get_logger
+
+from nomad_tajine_plugin.schema_packages import schema_package
+from nomad_tajine_plugin.schema_packages.schema_package import Ingredient
+from nomad_tajine_plugin.schema_packages.usda_lookup.usda_lookup import get_usda_data
+
+
+def test_get_usda_data(fdc_server):
+    result = get_usda_data('oil olive', 'key', api_url=fdc_server.url)
+
+    assert result['calories_kcal'] == 884  # noqa: PLR2004
+    assert result['fat'] == 100  # noqa: PLR2004
+    assert result['diet_type'] == 'ambiguous'
+    assert result['ndb_id'] == 4053  # noqa: PLR2004
+    assert fdc_server.requests[0]['api_key'] == ['key']
+    assert get_usda_data('unobtainium', 'key', api_url=fdc_server.url) is None
+
+
+def test_get_usda_data_latency(fdc_server):
+    fdc_server.latency = 0.2
+    start = time.perf_counter()
+    result = get_usda_data('garlic', 'key', api_url=fdc_server.url)
+
+    assert result['diet_type'] == 'vegan'
+    assert time.perf_counter() - start >= 0.2  # noqa: PLR2004
+
+
+@pytest.mark.parametrize('fault', ['timeouts', 'rate_limited', 'malformed'])
+def test_get_usda_data_faults(fdc_server, fault):
+    setattr(fdc_server, fault, 1)
+    start = time.perf_counter()
+
+    assert get_usda_data('garlic', 'key', api_url=fdc_server.url, timeout=0.2) is None
+    assert time.perf_counter() - start < 1
+    # only the first request fails
+    assert get_usda_data('garlic', 'key', api_url=fdc_server.url) is not None
+
+
+def test_ingredient_lookup(monkeypatch, fdc_server):
+    monkeypatch.setattr(schema_package.configuration, 'usda_api_url', fdc_server.url)
+    ingredient = Ingredient(name='Carrots')
+    archive = EntryArchive(data=ingredient, metadata=EntryMetadata())
+    ingredient.normalize(archive, get_logger(__name__))
+
+    assert ingredient.lab_id == 'carrots'
+    assert ingredient.calories_per_100_g.magnitude == pytest.approx(41)
+    assert ingredient.diet_type == 'vegan'
+    assert ingredient.fdc_id == fdc_server.foods[2]['fdcId']
@@ -0,0 +1,124 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from nomad_tajine_plugin.client import RECIPE_SCHEMA, NomadClient, retry_delay
+
+ENTRIES = [
+    {'entry_id': f'entry{index:03d}', 'data': {'name': f'Recipe {index}', 'x': 1}}
+    for index in range(25)
+]
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Serves the entries through the query endpoints with cursor pagination.
+    """
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.requests.append((self.path, body))
+        if self.server.busy:
+            self.server.busy -= 1
+            self.send_response(429)
+            self.send_header('Retry-After', '0')
+            self.end_headers()
+            return
+
+        pagination = body['pagination']
+        start = int(pagination.get('page_after_value', -1)) + 1
+        end = start + pagination['page_size']
+        page = ENTRIES[start:end]
+        if self.path.endswith('/entries/archive/query'):
+            fields = body['required']['data']
+            data = [
+                {
+                    'entry_id': entry['entry_id'],
+                    'upload_id': 'upload1',
+                    'archive': {'data': {k: entry['data'][k] for k in fields}},
+                }
+                for entry in page
+            ]
+        else:
+            data = [{'entry_id': entry['entry_id']} for entry in page]
+        next_value = str(end - 1) if end < len(ENTRIES) else None
+        content = json.dumps(
+            {'pagination': {'next_page_after_value': next_value}, 'data': data}
+        ).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    server.requests = []
+    server.busy = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_iter_recipes(stand_in_server):
+    client = NomadClient(f'http://127.0.0.1:{stand_in_server.server_port}/api/v1')
+    recipes = list(client.iter_recipes(fields=('name',), page_size=10))
+
+    assert [recipe['name'] for recipe in recipes] == [
+        entry['data']['name'] for entry in ENTRIES
+    ]
+    assert recipes[0] == {
+        'name': 'Recipe 0',
+        'entry_id': 'entry000',
+        'upload_id': 'upload1',
+    }
+    paths = {path for path, _ in stand_in_server.requests}
+    assert paths == {'/api/v1/entries/archive/query'}
+    bodies = [body for _, body in stand_in_server.requests]
+    assert [body['pagination'].get('page_after_value') for body in bodies] == [
+        None,
+        '9',
+        '19',
+    ]
+    assert bodies[0]['query']['section_defs.definition_qualified_name'] == (
+        RECIPE_SCHEMA
+    )
+
+
+def test_iter_entries_prefetch(stand_in_server):
+    client = NomadClient(f'http://127.0.0.1:{stand_in_server.server_port}/api/v1')
+    stand_in_server.busy = 1
+    entries = client.iter_entries(include=['entry_id'], page_size=10)
+
+    assert next(entries) == {'entry_id': 'entry000'}
+    # the second page is requested while the first one is consumed
+    for _ in range(50):
+        if len(stand_in_server.requests) == 3:  # noqa: PLR2004
+            break
+        time.sleep(0.01)
+    assert len(stand_in_server.requests) == 3  # noqa: PLR2004
+    assert len(list(entries)) == len(ENTRIES) - 1
+    assert stand_in_server.requests[0][1]['required'] == {'include': ['entry_id']}
+
+
+def test_retry_delay():
+    in_a_minute = datetime.now(timezone.utc) + timedelta(seconds=60)
+    assert retry_delay('3', 0) == 3  # noqa: PLR2004
+    assert retry_delay(format_datetime(in_a_minute, usegmt=True), 0) == (
+        pytest.approx(60, abs=5)
+    )
+    assert retry_delay('Wed, 21 Oct 2015 07:28:00 GMT', 0) == 0
+    assert retry_delay('soon', 2) == 4  # noqa: PLR2004
+    assert retry_delay(None, 1) == 2  # noqa: PLR2004
@@ -0,0 +1,66 @@
+import pytest
+
+from nomad_tajine_plugin.export import (
+    TABLES,
+    ParquetWriter,
+    export,
+    iter_directory,
+    iter_rows,
+)
+
+
+def test_iter_rows():
+    archives = dict(iter_directory('tests/data'))
+    rows = list(iter_rows('cacio', archives['cacio.archive.yaml']))
+    tables = [table for table, _ in rows]
+    assert tables[0] == 'recipes'
+    assert set(tables[1:]) == {'step_ingredients'}
+    recipe = rows[0][1]
+    assert recipe['name'] == 'Cacio e Pepe'
+    assert recipe['number_of_servings'] == 2  # noqa: PLR2004
+    assert set(recipe) == set(TABLES['recipes'])
+    step_ingredient = rows[2][1]
+    assert step_ingredient['type'] == 'IngredientVolume'
+    assert step_ingredient['volume'] == 15  # noqa: PLR2004
+    assert step_ingredient['recipe_name'] == 'Cacio e Pepe'
+
+    ingredient = {
+        'm_def': '../uploads/u/archive/e#/definitions/Ingredient',
+        'fdc_id': 1,
+    }
+    assert list(iter_rows('e', ingredient))[0][1]['fdc_id'] == 1
+    assert list(iter_rows('e', {'m_def': 'x.RecipeScaler'})) == []
+
+
+def test_export(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    counts = export(iter_directory('tests/data'), str(tmp_path), batch_size=5)
+
+    recipes = pq.read_table(tmp_path / 'recipes')
+    assert recipes.num_rows == counts['recipes']
+    assert len(list((tmp_path / 'recipes').iterdir())) == -(-counts['recipes'] // 5)
+    assert 'Cacio e Pepe' in recipes.column('name').to_pylist()
+    step_ingredients = pq.read_table(tmp_path / 'step_ingredients')
+    assert step_ingredients.num_rows == counts['step_ingredients']
+
+
+def test_parquet_writer(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    writer = ParquetWriter(str(tmp_path), batch_size=2)
+    for index in range(3):
+        data = {'m_def': 'x.Ingredient', 'name': f'Ingredient {index}', 'fdc_id': index}
+        for table, row in iter_rows(f'entry{index}', data):
+            writer.add(table, row)
+    # the first batch is written as soon as it is full
+    assert [path.name for path in (tmp_path / 'ingredients').iterdir()] == [
+        'part-00000.parquet'
+    ]
+    counts = writer.close()
+
+    assert counts == {'recipes': 0, 'step_ingredients': 0, 'ingredients': 3}
+    parts = sorted((tmp_path / 'ingredients').iterdir())
+    assert [pq.read_metadata(part).num_rows for part in parts] == [2, 1]
+    table = pq.read_table(tmp_path / 'ingredients')
+    assert table.schema.equals(ParquetWriter.schema('ingredients'))
+    assert table.column('fdc_id').to_pylist() == [0, 1, 2]
+    assert not (tmp_path / 'recipes').exists()
@@ -0,0 +1,78 @@
+import subprocess
+import sys
+
+ENTRY_POINT_MODULES = (
+    'nomad_tajine_plugin.schema_packages',
+    'nomad_tajine_plugin.parsers',
+    'nomad_tajine_plugin.apps',
+    'nomad_tajine_plugin.example_uploads',
+    # needed by the entry points of the parsers
+    'nomad_tajine_plugin.schema_packages.usda_lookup.usda_lookup',
+)
+# only needed once entries are processed
+HEAVY_MODULES = (
+    'requests',
+    'nomad.datamodel',
+    'nomad.metainfo',
+    'nomad_tajine_plugin.schema_packages.schema_package',
+)
+# imported by NOMAD anyway before the schema package is loaded
+FRAMEWORK_MODULES = (
+    'nomad.datamodel',
+    'nomad.datamodel.metainfo.basesections',
+    'nomad.metainfo',
+    'nomad.units',
+)
+
+
+def import_times(*modules: str, preload: tuple[str, ...] = ()) -> dict[str, int]:
+    """
+    Imports the modules in a new interpreter after the `preload` modules and
+    returns the cumulative time in microseconds every newly imported module took to
+    import, including its own imports.
+    """
+    code = f'import {", ".join(modules)}'
+    if preload:
+        code = f'import {", ".join(preload)}; {code}'
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line.removeprefix('import time:').split('|')
+        if name.strip() in preload and not name.startswith('  '):
+            # a preloaded module is listed after its imports, forget them all
+            times = {}
+            continue
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_entry_points_import_lazily():
+    times = import_times(*ENTRY_POINT_MODULES)
+
+    assert set(ENTRY_POINT_MODULES) <= set(times)
+    assert [module for module in HEAVY_MODULES if module in times] == []
+
+
+def test_import_time_budget(request):
+    budget = request.config.getoption('--import-time-budget')
+    module = 'nomad_tajine_plugin.schema_packages.schema_package'
+    times = import_times(module, preload=FRAMEWORK_MODULES)
+    # everything the plugin pulls in on top of the framework
+    total = times[module] / 1e6
+
+    slowest = sorted(
+        ((name, time) for name, time in times.items() if name != module),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    assert total <= budget, (
+        f'Importing {module} took {total:.2f} s on top of NOMAD, '
+        f'slowest imports: {slowest[:3]}'
+    )
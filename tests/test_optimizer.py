@@ -0,0 +1,59 @@
+import time
+
+import numpy as np
+import pytest
+
+from nomad_tajine_plugin.optimizer import load_candidates, plan_meals
+
+TARGETS = dict(calories=2000, protein=120, fat=70, carbohydrates=220)
+
+
+def generate_recipes(number_of_recipes, seed=0):
+    rng = np.random.default_rng(seed)
+    diet_types = rng.choice(['vegan', 'vegetarian', 'omnivorous'], number_of_recipes)
+    protein = rng.uniform(2, 50, number_of_recipes)
+    fat = rng.uniform(1, 40, number_of_recipes)
+    carbohydrates = rng.uniform(0, 100, number_of_recipes)
+    return [
+        {
+            'entry_id': f'entry{index}',
+            'upload_id': 'upload1',
+            'name': f'Recipe {index}',
+            'diet_type': diet_types[index],
+            'duration': 30.0,
+            'protein_per_serving': protein[index],
+            'fat_per_serving': fat[index],
+            'carbohydrates_per_serving': carbohydrates[index],
+            'calories_per_serving': 4 * (protein[index] + carbohydrates[index])
+            + 9 * fat[index],
+        }
+        for index in range(number_of_recipes)
+    ]
+
+
+def test_load_candidates():
+    recipes = generate_recipes(10)
+    recipes[0]['fat_per_serving'] = None
+    candidates, nutrients = load_candidates(recipes, 'vegetarian')
+
+    assert all(c['diet_type'] in ('vegan', 'vegetarian') for c in candidates)
+    assert recipes[0] not in candidates
+    assert nutrients.shape == (len(candidates), 4)
+
+
+def test_plan_meals():
+    recipes = generate_recipes(5000)
+    start = time.perf_counter()
+    plan = plan_meals(recipes, **TARGETS, diet_type='vegan', number_of_days=2)
+    assert time.perf_counter() - start < 1
+
+    assert len(plan.meals) == 6  # noqa: PLR2004
+    assert {meal.day for meal in plan.meals} == {1, 2}
+    assert len({meal.name for meal in plan.meals}) == 6  # noqa: PLR2004
+    assert plan.diet_type == 'vegan'
+    assert all(meal.servings % 0.25 == 0 for meal in plan.meals)
+    assert plan.meals[0].recipe.m_proxy_value.startswith('../uploads/upload1/')
+    for day in plan.days:
+        for nutrient, target in TARGETS.items():
+            value = getattr(day, nutrient).magnitude
+            assert value == pytest.approx(target, rel=0.05)
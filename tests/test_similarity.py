@@ -0,0 +1,76 @@
+import pytest
+from pydantic import ValidationError
+
+from nomad_tajine_plugin.schema_packages import TajineSchemaPackageEntryPoint
+from nomad_tajine_plugin.similarity import (
+    estimate_similarity,
+    jaccard_similarity,
+    lsh_band_keys,
+    minhash_signature,
+    rerank_by_jaccard,
+)
+
+PANCAKES = {'flour', 'milk', 'egg', 'butter', 'sugar', 'salt', 'baking_powder'}
+CREPES = {'flour', 'milk', 'egg', 'butter', 'sugar', 'salt'}
+CURRY = {'chickpeas', 'onion', 'garlic', 'ginger', 'tomato', 'cumin', 'rice'}
+
+
+def test_minhash_signature():
+    signature = minhash_signature(PANCAKES, 128)
+    assert len(signature) == 128  # noqa: PLR2004
+    # independent of the order and of duplicates
+    assert (signature == minhash_signature([*sorted(PANCAKES), 'egg'], 128)).all()
+    assert minhash_signature([]) is None
+
+    similarity = estimate_similarity(signature, minhash_signature(CREPES, 128))
+    assert similarity == pytest.approx(jaccard_similarity(PANCAKES, CREPES), abs=0.15)
+    assert estimate_similarity(signature, minhash_signature(CURRY, 128)) < 0.1  # noqa: PLR2004
+
+
+def test_lsh_band_keys():
+    keys = {
+        name: set(lsh_band_keys(minhash_signature(tokens), 16))
+        for name, tokens in [
+            ('pancakes', PANCAKES),
+            ('crepes', CREPES),
+            ('curry', CURRY),
+        ]
+    }
+    assert len(keys['pancakes']) == 16  # noqa: PLR2004
+    assert keys['pancakes'] & keys['crepes']
+    assert not keys['pancakes'] & keys['curry']
+
+
+@pytest.mark.parametrize('bands', [0, 12, 128])
+def test_lsh_band_keys_invalid_bands(bands):
+    with pytest.raises(ValueError, match='bands'):
+        lsh_band_keys(minhash_signature(PANCAKES, 64), bands)
+
+
+@pytest.mark.parametrize(
+    'permutations, bands, valid',
+    [(64, 16, True), (64, 64, True), (64, 0, False), (64, 12, False), (8, 16, False)],
+)
+def test_minhash_bands_validation(permutations, bands, valid):
+    def entry_point():
+        return TajineSchemaPackageEntryPoint(
+            name='TajineSchemaPackage',
+            minhash_permutations=permutations,
+            minhash_bands=bands,
+        )
+
+    if valid:
+        assert entry_point().minhash_bands == bands
+    else:
+        with pytest.raises(ValidationError, match='minhash_bands'):
+            entry_point()
+
+
+def test_rerank_by_jaccard():
+    candidates = [('curry', CURRY), ('crepes', CREPES), ('pancakes', PANCAKES)]
+    ranked = rerank_by_jaccard(PANCAKES, candidates, top_k=2)
+    assert [candidate_id for candidate_id, _ in ranked] == ['pancakes', 'crepes']
+    assert ranked[1][1] == pytest.approx(6 / 7)
+    assert rerank_by_jaccard(PANCAKES, candidates, min_similarity=0.5)[-1][0] == (
+        'crepes'
+    )
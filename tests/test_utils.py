@@ -0,0 +1,181 @@
+import io
+import json
+import os
+from contextlib import contextmanager
+
+from nomad.datamodel import EntryArchive, EntryMetadata
+
+from nomad_tajine_plugin.schema_packages.schema_package import Ingredient
+from nomad_tajine_plugin.utils import (
+    BufferedLogger,
+    create_archives,
+    find_archive,
+    get_entry_id_from_file_name,
+    list_raw_files,
+    pop_trace_summary,
+    trace_span,
+)
+
+
+class RecordingContext:
+    def __init__(self, existing):
+        self.files = dict.fromkeys(existing, {})
+        self.calls = []
+
+    def raw_path_exists(self, path):
+        self.calls.append(('exists', path))
+        return path in self.files
+
+    @contextmanager
+    def update_entry(self, mainfile, write=False, process=False):
+        self.calls.append(('write', mainfile, process))
+        self.files[mainfile] = content = {}
+        yield content
+
+    @contextmanager
+    def raw_file(self, path, mode='r'):
+        self.calls.append(('raw', path))
+        f = io.StringIO()
+        yield f
+        self.files[path] = f.getvalue()
+
+    def process_updated_raw_file(self, path, allow_modify=False):
+        self.calls.append(('process', path))
+
+
+def test_create_archives():
+    context = RecordingContext(existing=['salt.archive.json'])
+    archive = EntryArchive(
+        metadata=EntryMetadata(upload_id='upload1'), m_context=context
+    )
+    entities = [
+        (Ingredient(name=name), f'{name}.archive.json')
+        for name in ('flour', 'salt', 'eggs')
+    ]
+    references = create_archives(entities, archive)
+
+    assert context.calls == [
+        ('exists', 'flour.archive.json'),
+        ('write', 'flour.archive.json', False),
+        ('exists', 'salt.archive.json'),
+        ('exists', 'eggs.archive.json'),
+        ('write', 'eggs.archive.json', False),
+        ('process', 'flour.archive.json'),
+        ('process', 'eggs.archive.json'),
+    ]
+    assert context.files['flour.archive.json']['data']['name'] == 'flour'
+    assert references[1] == (
+        '../uploads/upload1/archive/'
+        f'{get_entry_id_from_file_name("salt.archive.json", archive)}#data'
+    )
+
+    # existence is known from the index now, no further checks
+    assert find_archive(archive, 'eggs.archive.json') == references[2]
+    assert context.calls[-1] == ('process', 'eggs.archive.json')
+
+
+def test_create_archives_compact():
+    context = RecordingContext(existing=[])
+    archive = EntryArchive(
+        metadata=EntryMetadata(upload_id='upload1'), m_context=context
+    )
+    create_archives(
+        [(Ingredient(name='flour'), 'flour.archive.json')], archive, compact=True
+    )
+
+    assert context.calls == [
+        ('exists', 'flour.archive.json'),
+        ('raw', 'flour.archive.json'),
+        ('process', 'flour.archive.json'),
+    ]
+    content = context.files['flour.archive.json']
+    assert '\n' not in content
+    assert ' ' not in content.replace('"name":"flour"', '')
+    assert json.loads(content)['data']['name'] == 'flour'
+
+
+class LocalContext(RecordingContext):
+    def __init__(self, local_dir):
+        super().__init__(existing=[])
+        self.local_dir = local_dir
+
+    def raw_path_exists(self, path):
+        self.calls.append(('exists', path))
+        return os.path.exists(os.path.join(self.local_dir, path))
+
+
+def test_find_archive_scans_directory(tmp_path):
+    (tmp_path / 'salt.archive.json').write_text('{}')
+    context = LocalContext(str(tmp_path))
+    archive = EntryArchive(
+        metadata=EntryMetadata(upload_id='upload1'), m_context=context
+    )
+
+    assert find_archive(archive, 'salt.archive.json') is not None
+    assert find_archive(archive, 'flour.archive.json') is None
+    assert find_archive(archive, 'ingredients/flour.archive.json') is None
+    assert context.calls == []
+
+
+def test_create_archives_rechecks_before_writing(tmp_path):
+    context = LocalContext(str(tmp_path))
+    archive = EntryArchive(
+        metadata=EntryMetadata(upload_id='upload1'), m_context=context
+    )
+    assert find_archive(archive, 'salt.archive.json') is None
+    # written by another entry of the upload after the directory was listed
+    (tmp_path / 'salt.archive.json').write_text('{}')
+
+    create_archives(
+        [
+            (Ingredient(name='salt'), 'salt.archive.json'),
+            (Ingredient(name='flour'), 'flour.archive.json'),
+        ],
+        archive,
+    )
+    assert context.calls == [
+        ('exists', 'salt.archive.json'),
+        ('exists', 'flour.archive.json'),
+        ('write', 'flour.archive.json', False),
+        ('process', 'flour.archive.json'),
+    ]
+
+
+class BrokenContext:
+    upload_files = object()
+
+    def raw_path(self):
+        raise KeyError('upload')
+
+
+def test_list_raw_files_without_raw_path():
+    assert list_raw_files(BrokenContext(), '') is None
+
+
+def test_trace_span():
+    archive = EntryArchive(data=Ingredient(name='Flour'), metadata=EntryMetadata())
+    logger = BufferedLogger()
+    with trace_span(archive, logger, 'lookup', archive.data, log=True, count=1) as span:
+        span['count'] += 1
+    with trace_span(archive, logger, 'lookup'):
+        pass
+
+    assert logger.records[0][1] == 'Normalization span.'
+    assert logger.records[0][3]['section_path'] == '/data'
+    assert logger.records[0][3]['count'] == 2  # noqa: PLR2004
+    assert pop_trace_summary(archive, threshold=60) is None
+    # the trace is removed once summarized
+    assert pop_trace_summary(archive, threshold=0) is None
+
+
+def test_trace_summary():
+    archive = EntryArchive(metadata=EntryMetadata())
+    for name in ('lookup', 'lookup', 'aggregate'):
+        with trace_span(archive, BufferedLogger(), name):
+            pass
+    summary = pop_trace_summary(archive, threshold=0)
+
+    assert summary['spans']['lookup']['count'] == 2  # noqa: PLR2004
+    assert summary['spans']['aggregate']['count'] == 1
+    assert summary['seconds'] >= summary['slowest'][0]['seconds']
+    assert len(summary['slowest']) == 3  # noqa: PLR2004